@@ -0,0 +1,229 @@
+"""Load test: many concurrent readers of one story server.
+
+    python bench/load.py --users 20 --duration 60                  # one soak, percentiles and server load
+    python bench/load.py --users 1 5 10 20 40 --target-p95 2       # sizing: readers per instance
+    python bench/load.py --users 20 --max-p95 3 --max-errors 0     # regression gate (exit status 1)
+
+Starts the story locally with ``streamlit run`` and simulates readers at the
+websocket level (see bench/sessions.py), with no external services. Each
+reader opens the story, then keeps reading: it moves on to the next section,
+optionally reruns it ``--reruns`` times (what moving a widget does), and
+pauses for a random think time averaging ``--think`` seconds. A render
+counts as complete once the script has finished and every chart and image
+it sent has been downloaded, as a browser would (each reader caches the
+files it has already fetched).
+
+For each soak of ``--duration`` seconds it reports p50/p95/p99 render
+time, renders per second, errors, and the server's CPU (cores busy) and
+RSS. The load generator shares the machine with the server, so on a small
+box the numbers are conservative. With several ``--users`` counts every
+count gets a fresh server, and ``--target-p95`` reports the most readers
+one instance served within it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from sessions import ROOT, Session, process_rss_mb, serve
+
+
+def process_cpu_s(pid):
+    """User plus system CPU seconds used by process *pid*."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def _fetch(url):
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return len(response.read())
+
+
+class Reader:
+    """One simulated reader, working through the story until *deadline*."""
+
+    def __init__(self, url, pages, reruns, think, rng):
+        self.url = url
+        self.pages = pages
+        self.reruns = reruns
+        self.think = think
+        self.rng = rng
+        self.fetched = set()
+        # (kind, page, seconds)
+        self.renders = []
+        self.errors = []
+
+    async def render(self, session, page, kind):
+        start = time.perf_counter()
+        await session.run(page)
+        new = [u for u in session.media if u not in self.fetched]
+        await asyncio.gather(*(asyncio.to_thread(_fetch, self.url + u) for u in new))
+        self.fetched.update(new)
+        self.renders.append((kind, page or self.pages[0], time.perf_counter() - start))
+
+    async def read(self, deadline):
+        try:
+            session = await Session.connect(self.url)
+        except Exception as e:  # noqa: BLE001 - counted, not fatal
+            self.errors.append(f"connect: {e!r}")
+            return
+        position = 0
+        try:
+            while time.monotonic() < deadline:
+                page = None if position == 0 else self.pages[position % len(self.pages)]
+                try:
+                    await self.render(session, page, "open")
+                    for _ in range(self.reruns):
+                        await self.render(session, page, "rerun")
+                except Exception as e:  # noqa: BLE001
+                    self.errors.append(f"{page}: {e!r}")
+                    return
+                position += 1
+                if self.think:
+                    await asyncio.sleep(self.rng.expovariate(1 / self.think))
+        finally:
+            await session.close()
+
+
+async def sample(pid, interval, stop, samples):
+    while not stop.is_set():
+        samples.append((time.monotonic(), process_cpu_s(pid), process_rss_mb(pid)))
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def soak(url, pid, users, duration, pages, reruns, think, ramp, seed):
+    """Run *users* readers for *duration* seconds and summarize what they saw."""
+    rng = random.Random(seed)
+    readers = [Reader(url, pages, reruns, think, random.Random(rng.random())) for _ in range(users)]
+    samples, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(sample(pid, 1.0, stop, samples))
+    start = time.monotonic()
+    deadline = start + duration
+
+    async def staggered(i, reader):
+        # spread the arrivals over the ramp-up instead of a thundering herd
+        await asyncio.sleep(ramp * i / max(users, 1))
+        await reader.read(deadline)
+
+    await asyncio.gather(*(staggered(i, r) for i, r in enumerate(readers)))
+    elapsed = time.monotonic() - start
+    stop.set()
+    await sampler
+
+    renders = [r for reader in readers for r in reader.renders]
+    times = [seconds for _, _, seconds in renders]
+    (t0, cpu0, _), (t1, cpu1, _) = samples[0], samples[-1]
+    result = {
+        "users": users,
+        "duration_s": round(elapsed, 1),
+        "renders": len(renders),
+        "renders_per_s": round(len(renders) / elapsed, 2),
+        "errors": sum(len(r.errors) for r in readers),
+        "p50_s": round(percentile(times, 50), 3),
+        "p95_s": round(percentile(times, 95), 3),
+        "p99_s": round(percentile(times, 99), 3),
+        "max_s": round(max(times, default=float("nan")), 3),
+        "server_cpu_cores": round((cpu1 - cpu0) / (t1 - t0), 2) if t1 > t0 else None,
+        "server_rss_start_mb": round(samples[0][2], 1),
+        "server_rss_peak_mb": round(max(rss for _, _, rss in samples), 1),
+        "server_rss_end_mb": round(samples[-1][2], 1),
+    }
+    by_page = {}
+    for _, page, seconds in renders:
+        by_page.setdefault(page, []).append(seconds)
+    result["p95_by_section_s"] = {page: round(percentile(v, 95), 3) for page, v in by_page.items()}
+    first_errors = [e for r in readers for e in r.errors][:5]
+    if first_errors:
+        result["first_errors"] = first_errors
+    return result
+
+
+async def warm_up(url, pages):
+    """Visit every section once, so the soak measures a warm server."""
+    session = await Session.connect(url)
+    try:
+        for page in [None] + pages[1:]:
+            await session.run(page)
+    finally:
+        await session.close()
+
+
+def run_step(args, users, pages):
+    env = {"DATASTORY_OFFLINE": "1"}
+    with serve(args.app, env=env) as (process, url):
+        if not args.cold:
+            asyncio.run(warm_up(url, pages))
+        return asyncio.run(soak(
+            url, process.pid, users, args.duration, pages, args.reruns, args.think, args.ramp, args.seed,
+        ))
+
+
+def main():
+    sys.path.insert(0, str(ROOT))
+    from datastory.story import SECTIONS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", nargs="+", type=int, default=[10], help="concurrent readers (several to size)")
+    parser.add_argument("--duration", default=30.0, type=float, help="soak seconds per --users count")
+    parser.add_argument("--ramp", default=5.0, type=float, help="seconds over which the readers arrive")
+    parser.add_argument("--think", default=1.0, type=float, help="mean pause between renders, 0 for none")
+    parser.add_argument("--reruns", default=0, type=int, help="reruns of each section after opening it")
+    parser.add_argument("--cold", action="store_true", help="skip visiting every section before the soak")
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--app", default=ROOT / "MLE_Story.py", type=Path, help="the story to serve")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    parser.add_argument("--target-p95", type=float, help="report the most readers served within this p95")
+    parser.add_argument("--max-p95", type=float, help="fail if any p95 is above this many seconds")
+    parser.add_argument("--max-errors", type=int, help="fail if any soak had more errors than this")
+    args = parser.parse_args()
+
+    pages = [url_path for _, _, url_path in SECTIONS]
+    results = []
+    for users in args.users:
+        result = run_step(args, users, pages)
+        results.append(result)
+        print(
+            f"{users:4d} readers  p50 {result['p50_s'] * 1000:7.0f} ms  p95 {result['p95_s'] * 1000:7.0f} ms"
+            f"  p99 {result['p99_s'] * 1000:7.0f} ms  {result['renders_per_s']:6.2f} renders/s"
+            f"  errors {result['errors']}  cpu {result['server_cpu_cores']} cores"
+            f"  rss {result['server_rss_start_mb']:.0f}-{result['server_rss_peak_mb']:.0f} MB",
+            flush=True,
+        )
+
+    report = {"settings": {k: str(v) for k, v in vars(args).items()}, "results": results}
+    if args.target_p95 is not None:
+        within = [r["users"] for r in results if r["p95_s"] <= args.target_p95 and not r["errors"]]
+        report["capacity"] = max(within, default=0)
+        print(f"most readers within p95 {args.target_p95:g} s: {report['capacity'] or 'none of those tried'}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=1))
+
+    failures = []
+    for r in results:
+        if args.max_p95 is not None and r["p95_s"] > args.max_p95:
+            failures.append(f"{r['users']} readers: p95 {r['p95_s']:.3f} s > {args.max_p95:g} s")
+        if args.max_errors is not None and r["errors"] > args.max_errors:
+            failures.append(f"{r['users']} readers: {r['errors']} errors > {args.max_errors}")
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
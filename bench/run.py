@@ -0,0 +1,431 @@
+"""Headless benchmarks for the story, with regression thresholds.
+
+    python bench/run.py                          # run and write bench/results.json
+    python bench/run.py --save-baseline          # ... and store it as bench/baseline.json
+    python bench/run.py --baseline bench/baseline.json --threshold 0.2
+
+Every scenario runs in a fresh child process with an empty cache directory
+and no network access, so "cold" really is cold:
+
+* ``app``: the whole story through Streamlit's AppTest harness, every
+  section once cold and once warm, with wall time, CPU time and RSS.
+* ``stages``: CSV parsing (from text and from the Arrow sidecars), appending
+  a new happiness release to the consolidated series, the
+  country index (U.S. filtering and concat), the crosstab percentages and
+  significance tests, the close-friends binning, the tabulation parser and
+  each figure render.
+* ``charts``: payload size and server time of each chart as a PNG and as
+  a client-side plotly spec, plus what an interaction (counts vs.
+  percentages, zooming into later years) costs the server on the PNG path.
+  On the plotly path interactions never reach the server.
+* ``microdata``: ingesting a synthetic GSS-shaped microdata file
+  (``--gss-rows`` respondents and a few hundred unused variables) into the
+  Parquet store, with peak RSS, the story's crosstabs computed from it,
+  and building and slicing the count cube the sidebar filters use.
+* ``startup``: a new instance's first page (the time from starting the
+  server until it is healthy is ``ready_s``) with an empty cache, after
+  ``python -m datastory.startup warm`` and with ``startup serve``
+  preloading, plus a fresh interpreter importing what the first page does.
+* ``stages`` again on synthetic inputs (``--scale`` times more happiness
+  rows and a tabulation with 7 ** ``--tab-levels`` columns), to see how
+  each stage scales.
+
+The run fails (exit status 1) when any wall time is more than
+``--threshold`` slower than the baseline, ignoring differences below
+``--min-delta`` seconds.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+sys.path.insert(0, str(ROOT))
+
+from datastory.story import SECTIONS  # noqa: E402
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def measure(func, repeat=1):
+    """Median wall and CPU seconds over *repeat* calls, plus the peak RSS afterwards."""
+    walls, cpus = [], []
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        func()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    return {
+        "wall_s": statistics.median(walls),
+        "cpu_s": statistics.median(cpus),
+        "min_wall_s": min(walls),
+        "repeat": repeat,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+# scenarios, each run in its own child process
+
+
+def scenario_app(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    metrics = {}
+    app = AppTest.from_file(str(ROOT / "MLE_Story.py"), default_timeout=300)
+    for phase in ("cold", "warm"):
+        before = rss_mb()
+        total_wall, total_cpu = time.perf_counter(), time.process_time()
+        for i, (section, _, _) in enumerate(SECTIONS):
+            name = Path(section).stem
+
+            def run():
+                (app.run() if i == 0 and phase == "cold" else app.switch_page(section).run())
+                if app.exception:
+                    raise RuntimeError(f"{section} raised: {app.exception[0].message}")
+
+            metrics[f"app.{phase}.section.{name}"] = measure(run)
+        metrics[f"app.{phase}.total"] = {
+            "wall_s": time.perf_counter() - total_wall,
+            "cpu_s": time.process_time() - total_cpu,
+            "repeat": 1,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "rss_growth_mb": round(rss_mb() - before, 1),
+        }
+    return metrics
+
+
+def _figures():
+    from datastory import charts, countries, loading
+    from datastory.gss import CLOSE_FRIENDS, CROSSTABS
+
+    us = countries.trend("United States", 2010, 2024)
+    satisfaction = loading.satisfaction()
+    bars = {
+        "friends": ("row_pct", "Socializing with Friends by Gender"),
+        "bar": ("row_pct", "Spending Evenings at a Bar by Gender"),
+        "bf_call": ("row_pct", "Frequency of Calling Best Friend by Gender (Percentage)"),
+        "interaction": ("counts", "Frequency of Visiting Best Friend by Gender"),
+        "needy_frd": ("counts", "Contributed to a Needy Friend by Gender"),
+        "romance": ("counts", "Romantic Partner Status by Gender"),
+    }
+    figures = {
+        "ladder_score": lambda: charts.line_chart(
+            us, "year", "Ladder score", label="Ladder Score", title="Change in Ladder Score Over Time",
+            xlabel="Year", ylabel="Ladder Score"),
+        "social_support": lambda: charts.line_chart(
+            us, "year", "Social support", label="Social support", title="Change in Social Support Over Time",
+            xlabel="Year", ylabel="Social Support Score"),
+        "life_satisfaction": lambda: charts.line_chart(
+            satisfaction, "Year", "Very Satisfied (%)", label="Very Satisfied (%)",
+            title="Change in Personal Life Satisfaction Over the Years", xlabel="Year",
+            ylabel="Percentage of 'Very Satisfied'", figsize=(10, 5), grid=True, rotate_xticks=45),
+        "close_friends": lambda: charts.bar_chart(
+            CLOSE_FRIENDS.frame(CLOSE_FRIENDS.fixed_edges(10)), "Number of Close Friends by Gender (Grouped by 10s)",
+            xlabel="Number of Close Friends (Grouped)", ylabel="Count"),
+    }
+    for name, (kind, title) in bars.items():
+        figures[name] = (lambda name=name, kind=kind, title=title: charts.bar_chart(
+            CROSSTABS.frame(name, kind), title, xlabel="Response", ylabel=kind))
+    return figures
+
+
+def scenario_stages(repeat):
+    from datastory import charts, countries, loading, releases, tabulation, trends
+    from datastory.binning import WeightedSample
+    from datastory.crosstab import CrosstabEngine
+    from datastory.gss import CROSSTABS, TABLES
+    from datastory.significance import CrosstabStats
+
+    metrics = {}
+    for name in ("happiness", "satisfaction", "gss_tabulation"):
+        # first load parses the text and writes the sidecar (or the series' parts); the second reads the sidecar
+        loading.clear()
+        metrics[f"load.text.{name}"] = measure(lambda: loading.load(name))
+        metrics[f"load.sidecar.{name}"] = measure(lambda: (loading.clear(), loading.load(name)), repeat)
+
+    # a new yearly release dropped in: only that file is parsed and appended to the series
+    with tempfile.TemporaryDirectory() as drop:
+        releases.RELEASES_DIR = Path(drop)
+        (Path(drop) / "happiness").mkdir()
+        shutil.copy(loading.DATA_DIR / "2024happiness.csv", Path(drop) / "happiness" / "2025happiness.csv")
+        metrics["load.append_release.happiness"] = measure(lambda: loading.load("happiness"))
+        (Path(drop) / "happiness" / "2025happiness.csv").unlink()
+        loading.load("happiness")
+
+    metrics["tabulation.parse"] = measure(
+        lambda: tabulation.read_tabulation(loading.SOURCES["gss_tabulation"].path), repeat)
+    metrics["us.index_filter_concat"] = measure(countries._build_index, repeat)
+    metrics["us.trend_lookup"] = measure(lambda: countries.trend("United States", 2010, 2024), repeat * 20)
+    metrics["trends.all_countries_all_metrics"] = measure(trends._build, repeat)
+    metrics["trends.leaderboard"] = measure(lambda: trends.analyze().frame("Ladder score"), repeat * 20)
+    metrics["crosstab.percentages"] = measure(lambda: CrosstabEngine(TABLES), repeat * 20)
+    metrics["crosstab.significance_2000_resamples"] = measure(lambda: CrosstabStats(CROSSTABS), repeat)
+
+    close_friends = WeightedSample.from_crosstab(CROSSTABS, "friends_count")
+    metrics["close_friends.binning_1_to_25"] = measure(
+        lambda: [close_friends.frame(close_friends.fixed_edges(w)) for w in range(1, 26)], repeat)
+
+    for name, render in _figures().items():
+        def cold_render():
+            charts.cache.clear()
+            render()
+
+        metrics[f"figure.{name}"] = measure(cold_render, repeat)
+    return metrics
+
+
+def _chart_variants():
+    """name -> (PNG render, PNG render after an interaction, plotly figure build)."""
+    from datastory import charts, countries, interactive, loading
+    from datastory.gss import CLOSE_FRIENDS, CROSSTABS
+
+    us = countries.trend("United States", 2010, 2024)
+    satisfaction = loading.satisfaction()
+    variants = {}
+    for name, df, x, y, title in (
+        ("ladder_score", us, "year", "Ladder score", "Change in Ladder Score Over Time"),
+        ("social_support", us, "year", "Social support", "Change in Social Support Over Time"),
+        ("life_satisfaction", satisfaction, "Year", "Very Satisfied (%)", "Change in Personal Life Satisfaction"),
+    ):
+        style = dict(label=y, title=title, xlabel=x, ylabel=y)
+        variants[name] = (
+            lambda df=df, x=x, y=y, style=style: charts.line_chart(df, x, y, **style),
+            # zooming in means a rerun with a narrower range
+            lambda df=df, x=x, y=y, style=style: charts.line_chart(df[df[x] >= 2015], x, y, **style),
+            lambda df=df, x=x, y=y, style=style: interactive.line_figure(df, x, y, **style),
+        )
+    bars = {
+        name: (CROSSTABS.frame(name), CROSSTABS.frame(name, "row_pct"))
+        for name in ("friends", "bar", "bf_call", "interaction", "needy_frd", "romance")
+    }
+    grouped = CLOSE_FRIENDS.frame(CLOSE_FRIENDS.fixed_edges(10))
+    bars["close_friends"] = (grouped, grouped / grouped.sum() * 100)
+    for name, (counts, percentages) in bars.items():
+        variants[name] = (
+            lambda counts=counts, name=name: charts.bar_chart(counts, name, "Response", "Count"),
+            # switching to percentages means a rerun and a second PNG
+            lambda percentages=percentages, name=name: charts.bar_chart(percentages, name, "Response", "Percentage"),
+            lambda counts=counts, percentages=percentages, name=name: interactive.bar_figure(
+                counts, percentages, name, "Response", "counts"),
+        )
+    return variants
+
+
+def scenario_charts(repeat):
+    import plotly.io
+    import plotly.tools
+    import streamlit.elements.plotly_chart  # noqa: F401 (installs the theme st.plotly_chart uses)
+
+    from datastory import charts
+
+    def spec(figure):
+        # what st.plotly_chart does with a figure on every run
+        return plotly.io.to_json(plotly.tools.return_figure_from_figure_or_data(figure, True), validate=False)
+
+    metrics = {}
+    for name, (png, interaction, build) in _chart_variants().items():
+        charts.cache.clear()
+        payload = png()
+        metrics[f"charts.{name}.png"] = dict(
+            measure(lambda: (charts.cache.clear(), png()), repeat), payload_bytes=len(payload))
+        metrics[f"charts.{name}.png.interaction"] = dict(
+            measure(lambda: (charts.cache.clear(), interaction()), repeat), payload_bytes=len(interaction()))
+        figure = build()
+        metrics[f"charts.{name}.plotly"] = dict(
+            measure(lambda: spec(build()), repeat), payload_bytes=len(spec(figure).encode()))
+        # built figures are cached, so a rerun only re-serializes
+        metrics[f"charts.{name}.plotly.rerun"] = measure(lambda: spec(figure), repeat)
+    return metrics
+
+
+def scenario_microdata(repeat, rows=100_000):
+    from synthetic import write_gss_microdata
+
+    from datastory import cube, microdata
+    from datastory.gss import CATEGORIES, TABLES, YEARS
+
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        source = write_gss_microdata(Path(tmp) / "gss.csv", rows, extra_columns=200)
+        store = Path(tmp) / "store"
+        before = peak_rss_mb()
+        ingest = measure(lambda: microdata.ingest(source, store, chunksize=25_000))
+        metrics["microdata.ingest"] = dict(
+            ingest, rows=rows, rss_growth_mb=round(peak_rss_mb() - before, 1),
+            source_mb=round(source.stat().st_size / 2**20, 1),
+            store_mb=round(sum(p.stat().st_size for p in store.rglob("*")) / 2**20, 1),
+        )
+        opened = microdata.Store(store)
+        metrics["microdata.crosstabs_story_years"] = measure(
+            lambda: [opened.crosstab(name, YEARS) for name in TABLES], repeat)
+        metrics["microdata.crosstabs_all_years"] = measure(
+            lambda: [opened.crosstab(name) for name in TABLES], repeat)
+        path = Path(tmp) / "cube.npy"
+        metrics["cube.build"] = measure(lambda: cube.build(opened, path))
+        metrics["cube.build"]["cube_kb"] = round(path.stat().st_size / 1024)
+        counts = cube.CountCube(path)
+        # every crosstab for a handful of year ranges and age groups, as the sidebar re-slices them
+        selections = [((2010, 2022), ()), ((1972, 2024), ()), ((2000, 2010), ("18-29",)), ((2016, 2018), ("65+", "45-64"))]
+        metrics["cube.slices"] = measure(
+            lambda: [counts.tables(years, bands, CATEGORIES) for years, bands in selections], repeat)
+    return metrics
+
+
+def scenario_startup(repeat):
+    import asyncio
+
+    from sessions import Session, serve
+
+    from datastory import startup
+
+    async def first_page(url):
+        session = await Session.connect(url)
+        try:
+            return (await session.run())[0]
+        finally:
+            await session.close()
+
+    def new_instance(command=None):
+        # a fresh server process: seconds until healthy, then the first page's run
+        start = time.perf_counter()
+        with serve(env={"DATASTORY_CHART_DISK_CACHE": "1"}, command=command) as (_, url):
+            ready = time.perf_counter() - start
+            return {"wall_s": asyncio.run(first_page(url)), "cpu_s": 0.0, "ready_s": round(ready, 3),
+                    "repeat": 1, "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+    metrics = {}
+    first = startup.preload_statements()
+    metrics["startup.imports.first_page"] = measure(
+        lambda: subprocess.run([sys.executable, "-c", "\n".join(first)], cwd=ROOT, check=True), repeat)
+    metrics["startup.first_page.cold_cache"] = new_instance()
+    metrics["startup.warm"] = measure(startup.warm)
+    metrics["startup.first_page.warm_cache"] = new_instance()
+    metrics["startup.first_page.preloaded"] = new_instance([sys.executable, "-m", "datastory.startup", "serve", "--"])
+    return metrics
+
+
+SCENARIOS = {
+    "app": scenario_app, "stages": scenario_stages, "charts": scenario_charts, "microdata": scenario_microdata,
+    "startup": scenario_startup,
+}
+
+
+def run_child(scenario, repeat, data_dir=None, extra=()):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(
+            os.environ,
+            DATASTORY_CACHE_DIR=cache_dir,
+            DATASTORY_CHART_DISK_CACHE="0",
+            DATASTORY_OFFLINE="1",
+        )
+        if data_dir is not None:
+            env["DATASTORY_DATA_DIR"] = str(data_dir)
+        out = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--child", scenario, "--repeat", str(repeat), *extra],
+            env=env, cwd=ROOT, check=True, stdout=subprocess.PIPE,
+        ).stdout
+    return json.loads(out)
+
+
+def compare(metrics, baseline, threshold, min_delta):
+    regressions = []
+    for name, result in sorted(metrics.items()):
+        old = baseline.get(name)
+        if not old or "wall_s" not in old:
+            continue
+        delta = result["wall_s"] - old["wall_s"]
+        if result["wall_s"] > old["wall_s"] * (1 + threshold) and delta > min_delta:
+            regressions.append((name, old["wall_s"], result["wall_s"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=HERE / "results.json", type=Path)
+    parser.add_argument("--baseline", default=HERE / "baseline.json", type=Path)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", default=0.25, type=float, help="allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--min-delta", default=0.005, type=float, help="ignore slowdowns below this many seconds")
+    parser.add_argument("--repeat", default=5, type=int)
+    parser.add_argument("--scale", default=100, type=int, help="happiness rows multiplier for the scale-up run")
+    parser.add_argument("--tab-levels", default=5, type=int, help="nested variables in the synthetic tabulation")
+    parser.add_argument("--no-scale", action="store_true", help="skip the synthetic scale-up run")
+    parser.add_argument("--gss-rows", default=100_000, type=int, help="respondents in the synthetic GSS microdata, 0 to skip")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        kwargs = {"rows": args.gss_rows} if args.child == "microdata" else {}
+        json.dump(SCENARIOS[args.child](args.repeat, **kwargs), sys.stdout)
+        return 0
+
+    from synthetic import write_dataset
+
+    metrics = {}
+    metrics.update(run_child("app", args.repeat))
+    metrics.update(run_child("stages", args.repeat))
+    metrics.update(run_child("charts", args.repeat))
+    metrics.update(run_child("startup", args.repeat))
+    if args.gss_rows:
+        metrics.update(run_child("microdata", args.repeat, extra=["--gss-rows", str(args.gss_rows)]))
+    if not args.no_scale:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, args.scale, args.tab_levels)
+            scaled = run_child("stages", args.repeat, data_dir)
+        prefix = f"scale{args.scale}x.tab{args.tab_levels}."
+        metrics.update({prefix + name: result for name, result in scaled.items() if not name.startswith("figure.")})
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": args.scale,
+            "tab_levels": args.tab_levels,
+        },
+        "metrics": metrics,
+    }
+    args.output.write_text(json.dumps(report, indent=1, sort_keys=True))
+    width = max(map(len, metrics))
+    for name, result in sorted(metrics.items()):
+        payload = f"  {result['payload_bytes'] / 1024:8.1f} KB" if "payload_bytes" in result else ""
+        print(f"{name:<{width}}  {result['wall_s'] * 1000:10.2f} ms  cpu {result['cpu_s'] * 1000:10.2f} ms"
+              f"  rss {result['peak_rss_mb']:7.1f} MB{payload}")
+    print(f"wrote {args.output}")
+
+    status = 0
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())["metrics"]
+        regressions = compare(metrics, baseline, args.threshold, args.min_delta)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms", file=sys.stderr)
+        status = 1 if regressions else 0
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=1, sort_keys=True))
+        print(f"saved baseline {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
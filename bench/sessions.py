@@ -0,0 +1,209 @@
+"""Server memory against the number of concurrent sessions.
+
+    python bench/sessions.py                        # RSS at 1, 50 and 200 sessions
+    python bench/sessions.py --sessions 1 10 100 --pages all
+
+Starts the story with ``streamlit run`` and connects sessions to it over
+Streamlit's websocket (``/_stcore/stream``) the way a browser tab does,
+with ``BackMsg`` / ``ForwardMsg`` protobufs. Every session runs the first
+section (``--pages all`` for every section in turn) and then stays
+connected. Once each step's count of sessions is connected and idle the
+server's resident memory is read from ``/proc``, so the difference between
+steps is what a session costs the server to keep.
+
+Measured with ``--pages all`` on one core, with warm caches:
+
+    sessions   before    after    (server RSS)
+           1   266 MB   259 MB
+          50   451 MB   268 MB
+         200   502 MB   299 MB
+
+"Before" is the story with ~1700 px chart PNGs and WebP images. ``st.image``
+decoded, rescaled and re-encoded those on every run of every session, and
+the concurrent decodes drove the allocator's high-water mark up by
+1.2-3.8 MB per session. "After" hands it images it sends as they are (see
+``MAX_WIDTH`` in datastory/assets.py), so a session costs ~0.2 MB, about
+what an empty Streamlit app's session does. Connecting the 200 sessions
+took 162 s instead of 356 s.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve(app=ROOT / "MLE_Story.py", port=None, env=None, timeout=60, command=None):
+    """Run *app* with ``streamlit run`` and yield ``(process, base url)`` once it is healthy.
+
+    *command* replaces ``streamlit run app``, e.g. ``python -m datastory.startup serve --``.
+    """
+    port = port or free_port()
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(
+            (command or [sys.executable, "-m", "streamlit", "run", str(app)])
+            + ["--server.headless", "true", "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+            cwd=Path(app).parent, env=dict(os.environ, **(env or {})), stdout=log, stderr=subprocess.STDOUT,
+        )
+        url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    urllib.request.urlopen(f"{url}/_stcore/health", timeout=1)
+                    break
+                except OSError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        log.seek(0)
+                        raise RuntimeError(f"streamlit did not start:\n{log.read().decode(errors='replace')}")
+                    time.sleep(0.2)
+            yield process, url
+        finally:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def process_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+class Session:
+    """One browser tab's websocket connection to the story."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        # page script hash per section url path, from the first navigation message
+        self.pages = {}
+        # media urls (chart and image files) the last run referred to
+        self.media = []
+
+    @classmethod
+    async def connect(cls, url):
+        import websockets
+
+        ws = await websockets.connect(
+            url.replace("http", "ws", 1) + "/_stcore/stream", subprotocols=["streamlit"], max_size=None,
+            # a busy single-core server can be slow to answer pings
+            ping_interval=None, open_timeout=None,
+        )
+        return cls(ws)
+
+    async def run(self, page=None, widgets=None):
+        """Run a section (the first one by default) and wait for it to finish.
+
+        Returns the seconds until ``script_finished``, the ``ForwardMsg``
+        count and the bytes received. *widgets* is a ``WidgetStates`` proto
+        for a rerun after a widget change.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = self.pages.get(page, "") if page else ""
+        if widgets is not None:
+            message.rerun_script.widget_states.CopyFrom(widgets)
+        start = time.perf_counter()
+        await self.ws.send(message.SerializeToString())
+        count = received = 0
+        self.media = []
+        while True:
+            payload = await self.ws.recv()
+            count += 1
+            received += len(payload)
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof("type")
+            if kind == "navigation" and not self.pages:
+                self.pages = {p.url_pathname or "": p.page_script_hash for p in forward.navigation.app_pages}
+            elif kind == "delta" and forward.delta.new_element.WhichOneof("type") == "imgs":
+                self.media += [image.url for image in forward.delta.new_element.imgs.imgs]
+            elif kind == "script_finished":
+                if forward.script_finished != forward.FINISHED_SUCCESSFULLY:
+                    raise RuntimeError(f"{page or 'first section'} did not finish: {forward.script_finished}")
+                return time.perf_counter() - start, count, received
+
+    async def close(self):
+        await self.ws.close()
+
+
+async def open_sessions(url, count, pages=(None,), concurrency=8):
+    """Connect *count* sessions that each run *pages* once, at most *concurrency* at a time."""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            session = await Session.connect(url)
+            for page in pages:
+                await session.run(page)
+            return session
+
+    return await asyncio.gather(*(one() for _ in range(count)))
+
+
+async def measure_sessions(url, pid, steps, pages, settle):
+    results, sessions = {}, []
+    for step in sorted(steps):
+        start = time.perf_counter()
+        sessions += await open_sessions(url, step - len(sessions), pages)
+        await asyncio.sleep(settle)
+        results[step] = {"rss_mb": round(process_rss_mb(pid), 1), "connect_s": round(time.perf_counter() - start, 1)}
+        print(f"{step:5d} sessions  rss {results[step]['rss_mb']:7.1f} MB", file=sys.stderr)
+    await asyncio.gather(*(s.close() for s in sessions))
+    first = min(results)
+    for step, result in results.items():
+        if step > first:
+            result["per_session_kb"] = round((result["rss_mb"] - results[first]["rss_mb"]) * 1024 / (step - first), 1)
+    return results
+
+
+def main():
+    from datastory.story import SECTIONS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 50, 200])
+    parser.add_argument("--pages", choices=["first", "all"], default="first",
+                        help="run just the first section in every session, or every section in turn")
+    parser.add_argument("--app", default=ROOT / "MLE_Story.py", type=Path, help="the story to serve")
+    parser.add_argument("--settle", default=2.0, type=float, help="seconds to wait before reading RSS")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    pages = (None,) if args.pages == "first" else [None] + [url_path for _, _, url_path in SECTIONS[1:]]
+    with serve(args.app) as (process, url):
+        results = asyncio.run(measure_sessions(url, process.pid, args.sessions, pages, args.settle))
+    for step, result in results.items():
+        growth = f"  {result['per_session_kb']:7.1f} KB/session" if "per_session_kb" in result else ""
+        print(f"{step:5d} sessions  rss {result['rss_mb']:7.1f} MB{growth}")
+    if args.output:
+        args.output.write_text(json.dumps({"pages": args.pages, "sessions": results}, indent=1))
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    sys.exit(main())
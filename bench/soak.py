@@ -0,0 +1,180 @@
+"""Soak test: memory over thousands of chart redraws.
+
+    python bench/soak.py                           # 10,000 redraws in this process
+    python bench/soak.py --server --reruns 2000    # section reruns against a served story
+    python bench/soak.py --unclosed --reruns 300   # the old pyplot lifecycle, for comparison
+
+The chart cache is limited to one entry and the disk tier is off, so every
+redraw misses the cache and draws a chart again, cycling through every
+chart of the story. RSS is sampled about every ``--every`` redraws (after
+whole cycles through the charts), and the growth
+after ``--warmup`` (a linear fit, in MB per 1000 redraws) should be about 0.
+With ``--server`` the same happens in a ``streamlit run`` server: one
+session reruns the sections in turn over its websocket (see
+bench/sessions.py) and the server's RSS is sampled.
+
+``--unclosed`` draws on pyplot figures that are never closed, which is what
+``st.pyplot(fig)`` after ``plt.subplots()`` does.
+
+Measured on one core:
+
+    lifecycle                 redraws   RSS after warm-up   peak      final     growth
+    managed (charts.py)        10,000        215 MB         234 MB    232 MB   -0.38 MB / 1000
+    pyplot, never closed          300        (140 MB at 0)  2976 MB   2976 MB   ~9.4 MB per redraw
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+
+# every redraw a cache miss
+os.environ.update(DATASTORY_CHART_CACHE_MB="0", DATASTORY_CHART_DISK_CACHE="0", DATASTORY_OFFLINE="1")
+
+
+def rss_mb(pid="self"):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def growth_per_1000(samples, warmup):
+    """Least-squares slope of RSS against redraws after *warmup*, in MB per 1000 redraws."""
+    points = [(n, rss) for n, rss in samples if n >= warmup]
+    if len(points) < 2:
+        return float("nan")
+    mean_n = sum(n for n, _ in points) / len(points)
+    mean_rss = sum(rss for _, rss in points) / len(points)
+    spread = sum((n - mean_n) ** 2 for n, _ in points)
+    return sum((n - mean_n) * (rss - mean_rss) for n, rss in points) / spread * 1000 if spread else 0.0
+
+
+def _renders():
+    """Every chart of the story, as functions that draw it."""
+    sys.path.insert(0, str(ROOT))
+    from datastory import charts, countries, gss, loading
+
+    us = countries.trend("United States")
+    satisfaction = loading.satisfaction()
+    close_friends = gss.CLOSE_FRIENDS
+    renders = [
+        lambda: charts.line_chart(us, "year", "Ladder score", "Ladder Score", "Ladder", "Year", "Ladder Score"),
+        lambda: charts.line_chart(us, "year", "Social support", "Social support", "Support", "Year", "Support"),
+        lambda: charts.line_chart(satisfaction, "Year", "Very Satisfied (%)", "Very Satisfied (%)",
+                                  "Satisfaction", "Year", "%", figsize=(10, 5), grid=True, rotate_xticks=45),
+        lambda: charts.multi_line_chart(countries.index().panel(countries.index().countries[:12], "Ladder score", 2010),
+                                        "Countries", "Year", "Ladder Score", legend_title="Country"),
+        lambda: charts.bar_chart(close_friends.frame(close_friends.fixed_edges(5)), "Close friends", "Friends", "%"),
+    ]
+    for name in gss.CROSSTABS.names:
+        renders.append(lambda name=name: charts.bar_chart(gss.CROSSTABS.frame(name, "row_pct"), name, "Response", "%"))
+    return renders
+
+
+def _unclosed(render_count):
+    """Draws like the story did before the render cache: pyplot figures nobody closes."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from datastory import gss
+
+    frames = [gss.CROSSTABS.frame(name, "row_pct") for name in gss.CROSSTABS.names]
+
+    def render(i):
+        import io
+
+        fig, ax = plt.subplots(figsize=(10, 6))
+        frames[i % len(frames)].plot(kind="bar", ax=ax)
+        fig.savefig(io.BytesIO(), format="png", bbox_inches="tight", dpi=200)
+
+    return [lambda i=i: render(i) for i in range(render_count)]
+
+
+def soak_process(reruns, every, unclosed=False):
+    import gc
+
+    renders = _unclosed(reruns) if unclosed else _renders()
+    if not unclosed:
+        # sample after whole cycles through the charts, so every sample follows the same chart
+        every = max(1, round(every / len(renders))) * len(renders)
+    samples = [(0, rss_mb())]
+    start = time.perf_counter()
+    for i in range(1, reruns + 1):
+        renders[(i - 1) % len(renders)]()
+        if i % every == 0 or i == reruns:
+            samples.append((i, rss_mb()))
+            print(f"{i:7d} redraws  rss {samples[-1][1]:7.1f} MB", file=sys.stderr, flush=True)
+    figures = len(sys.modules["matplotlib.pyplot"].get_fignums()) if "matplotlib.pyplot" in sys.modules else 0
+    return samples, time.perf_counter() - start, {"open_pyplot_figures": figures, "gc_objects": len(gc.get_objects())}
+
+
+def soak_server(reruns, every, app):
+    from sessions import Session, serve
+
+    from datastory.story import SECTIONS
+
+    async def rerun(url, pid):
+        session = await Session.connect(url)
+        pages = [None] + [url_path for _, _, url_path in SECTIONS[1:]]
+        samples = [(0, rss_mb(pid))]
+        try:
+            for i in range(1, reruns + 1):
+                await session.run(pages[(i - 1) % len(pages)])
+                if i % every == 0 or i == reruns:
+                    samples.append((i, rss_mb(pid)))
+                    print(f"{i:7d} reruns  rss {samples[-1][1]:7.1f} MB", file=sys.stderr, flush=True)
+        finally:
+            await session.close()
+        return samples
+
+    with serve(app, env={k: os.environ[k] for k in ("DATASTORY_CHART_CACHE_MB", "DATASTORY_CHART_DISK_CACHE")}) \
+            as (process, url):
+        start = time.perf_counter()
+        samples = asyncio.run(rerun(url, process.pid))
+        return samples, time.perf_counter() - start, {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", default=10_000, type=int, help="redraws (or section reruns with --server)")
+    parser.add_argument("--every", default=500, type=int, help="sample RSS every this many")
+    parser.add_argument("--warmup", default=1000, type=int, help="ignore growth before this many")
+    parser.add_argument("--server", action="store_true", help="rerun sections of a served story instead")
+    parser.add_argument("--unclosed", action="store_true", help="draw on pyplot figures that are never closed")
+    parser.add_argument("--app", default=ROOT / "MLE_Story.py", type=Path, help="the story to serve with --server")
+    parser.add_argument("--max-growth", type=float, help="fail if RSS grows more than this many MB per 1000")
+    parser.add_argument("--output", type=Path, help="also write the samples as JSON")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    if args.server:
+        samples, seconds, extra = soak_server(args.reruns, args.every, args.app)
+    else:
+        samples, seconds, extra = soak_process(args.reruns, args.every, args.unclosed)
+    warm = next((rss for n, rss in samples if n >= args.warmup), samples[-1][1])
+    result = dict(
+        reruns=args.reruns, seconds=round(seconds, 1), rss_start_mb=round(samples[0][1], 1),
+        rss_after_warmup_mb=round(warm, 1), rss_final_mb=round(samples[-1][1], 1),
+        rss_peak_mb=round(max(rss for _, rss in samples), 1),
+        growth_mb_per_1000=round(growth_per_1000(samples, args.warmup), 3), **extra,
+    )
+    print(json.dumps(result, indent=1))
+    if args.output:
+        args.output.write_text(json.dumps(dict(result, samples=samples), indent=1))
+    if args.max_growth is not None and result["growth_mb_per_1000"] > args.max_growth:
+        print(f"FAILED RSS grew {result['growth_mb_per_1000']} MB per 1000 > {args.max_growth}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Synthetic, scaled-up copies of the story's inputs for the benchmarks.
+
+``write_dataset(directory, scale, tabulation_levels)`` writes every file the
+story reads into *directory*: the happiness files with each country repeated
+*scale* times (the real rows are kept, so "United States" still exists), the
+Gallup file as-is, and a GSS tabulation export with *tabulation_levels*
+nested column variables of seven categories each (7 ** levels columns).
+
+``write_gss_microdata(path, rows)`` writes a GSS-shaped microdata CSV for
+``python -m datastory.microdata ingest``: one row per respondent and year,
+the story's items answered with the male/female response shares of the
+crosstabs in datastory/gss.py (and "IAP" in the years an item was not
+asked), plus *extra_columns* unrelated variables the ingestion must skip.
+"""
+import csv
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+CATEGORIES = [
+    "ALMOST DAILY", "SEV TIMES A WEEK", "SEV TIMES A MNTH", "ONCE A MONTH",
+    "SEV TIMES A YEAR", "ONCE A YEAR", "NEVER",
+]
+
+
+def scaled_happiness(filename, scale, seed=0):
+    """The happiness file with every country repeated *scale* times under new names."""
+    df = pd.read_csv(ROOT / filename, encoding="ISO-8859-1")
+    rng = np.random.default_rng(seed)
+    numeric = df.select_dtypes("number").columns.drop("year", errors="ignore")
+    copies = [df]
+    for k in range(1, scale):
+        copy = df.copy()
+        copy["Country name"] = copy["Country name"] + f" {k}"
+        copy[numeric] = copy[numeric] * rng.normal(1, 0.02, size=(len(copy), len(numeric)))
+        copies.append(copy.round(3))
+    return pd.concat(copies, ignore_index=True)
+
+
+def write_tabulation(path, levels):
+    """A GSS Data Explorer export shaped like tabulation.csv, with 7 ** levels data columns."""
+    width = len(CATEGORIES) ** levels
+    rng = np.random.default_rng(levels)
+    male = rng.integers(0, 101, size=width + 1)
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerows([["SEX (respondents sex)"], ["MALE"], ["FEMALE"], ["Total"]])
+        for level in range(levels):
+            writer.writerow([f"VAR{level} (synthetic variable {level})"] + [""] * (width - 1) + ["Total"])
+            span = len(CATEGORIES) ** (levels - level - 1)
+            writer.writerow([CATEGORIES[(j // span) % len(CATEGORIES)] if j % span == 0 else "" for j in range(width)] + [""])
+        writer.writerow([f"{m}%" for m in male])
+        writer.writerow([f"{100 - m}%" for m in male])
+        writer.writerow(["100%"] * (width + 1))
+
+
+# GSS years: annual until 1994, every other year since
+GSS_YEARS = list(range(1972, 1994)) + list(range(1994, 2025, 2))
+
+
+def write_gss_microdata(path, rows=200_000, extra_columns=500, chunksize=50_000, seed=0):
+    """A GSS-shaped microdata CSV with *rows* respondents, written *chunksize* rows at a time."""
+    from datastory.gss import TABLES
+    from datastory.microdata import ALIASES, ITEMS
+
+    rng = np.random.default_rng(seed)
+    answers = {}
+    for name, item in ITEMS.items():
+        table = TABLES.get(name)
+        if table is None:
+            labels, shares = CATEGORIES, np.full((2, len(CATEGORIES)), 1 / len(CATEGORIES))
+        else:
+            labels = [c for c in table if c not in ("SEX (respondents sex)", "Total")]
+            counts = np.array([table[c][:2] for c in labels], dtype=float).T + 0.5
+            shares = counts / counts.sum(axis=1, keepdims=True)
+        inverse = {v: k for k, v in ALIASES.get(name, {}).items()}
+        labels = [inverse.get(label, label) for label in labels]
+        # the module items were only asked in some years
+        asked = set(GSS_YEARS) if name in ("friends", "bar", "neighbors") else \
+            set(rng.choice(GSS_YEARS, size=8, replace=False).tolist())
+        answers[item.column] = (np.array(labels, dtype=object), shares, asked)
+
+    path = Path(path)
+    for start in range(0, rows, chunksize):
+        n = min(chunksize, rows - start)
+        year = rng.choice(GSS_YEARS, size=n)
+        sex = rng.integers(0, 2, size=n)
+        chunk = {"year": year, "id": np.arange(start, start + n), "sex": np.array(["MALE", "FEMALE"])[sex]}
+        age = rng.integers(18, 95, size=n).astype(object)
+        age[age >= 89] = "89 OR OLDER"
+        age[rng.random(n) < 0.01] = "DK"
+        chunk["age"] = age
+        for column, (labels, shares, asked) in answers.items():
+            cumulative = shares.cumsum(axis=1)[sex]
+            picked = (rng.random((n, 1)) > cumulative).sum(axis=1).clip(max=len(labels) - 1)
+            values = labels[picked]
+            values[~np.isin(year, list(asked))] = "IAP"
+            values[rng.random(n) < 0.02] = "DK"
+            chunk[column] = values
+        for k in range(extra_columns):
+            chunk[f"v{k:04d}"] = rng.integers(0, 10, size=n, dtype=np.int8)
+        pd.DataFrame(chunk).to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    return path
+
+
+def write_dataset(directory, scale=100, tabulation_levels=5):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for filename in ("2005happiness.csv", "2024happiness.csv"):
+        scaled_happiness(filename, scale).to_csv(directory / filename, index=False, encoding="ISO-8859-1")
+    shutil.copy(ROOT / "Personal_Life_Satisfaction.csv", directory)
+    write_tabulation(directory / "tabulation.csv", tabulation_levels)
+    return directory
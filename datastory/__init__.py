@@ -0,0 +1 @@
+"""Supporting code for the MLE_Story.py data story."""
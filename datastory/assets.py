@@ -0,0 +1,194 @@
+"""Local image assets: content-addressed cache, resized variants and offline fallback.
+
+Each image is resolved to a local file, fetching its remote URL at most once
+(and remembering failures, so a slow host is not retried on every rerun) or
+falling back to the copy bundled in the repo. Files are stored under
+``.cache/assets`` by content hash, and variants at a few widths are
+generated once per original, so the page is sent the smallest variant that
+fills the column. Variants are JPEG (PNG for images with transparency) and
+at most ``MAX_WIDTH`` wide, which ``st.image`` sends as they are; anything
+else it decodes and re-encodes on every run of every session.
+
+Set ``DATASTORY_OFFLINE=1`` to never touch the network.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+from PIL import Image
+
+from datastory import perf
+from datastory.loading import CACHE_DIR, ROOT
+
+logger = logging.getLogger(__name__)
+
+ASSET_DIR = CACHE_DIR / "assets"
+WIDTHS = (480, 720, 1080, 1440)
+# the centered layout's content column, in CSS pixels
+COLUMN_WIDTH = 704
+# the widest image st.image does not scale down itself
+MAX_WIDTH = 1460
+# Variants used to be WebP, which is smaller, but st.image only sends JPEG and PNG
+# through untouched: a WebP was decoded and re-encoded on every run of every
+# session, and that per-session memory (see bench/sessions.py) costs more than
+# the extra bytes of a JPEG do.
+JPEG_QUALITY = 85
+FETCH_TIMEOUT = 3
+RETRY_AFTER = 600
+
+
+@dataclass(frozen=True)
+class Asset:
+    url: str = None
+    bundled: str = None
+
+
+ASSETS = {
+    "twitter_discourse": Asset(url="https://i.imgur.com/1OgcrQJ.jpeg", bundled="DSmeme.jpg"),
+    "excel_html_cell": Asset(url="https://i.imgur.com/YXLHhZu.png"),
+}
+
+_lock = threading.Lock()
+# asset name -> time of the last failed fetch
+_failed = {}
+# asset name -> {width: path}, once generated in this process
+_variants = {}
+
+
+def offline():
+    return os.environ.get("DATASTORY_OFFLINE") == "1"
+
+
+def _index_path():
+    return ASSET_DIR / "index.json"
+
+
+def _read_index():
+    try:
+        return json.loads(_index_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(index):
+    ASSET_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = _index_path().with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(json.dumps(index, indent=1, sort_keys=True))
+    os.replace(tmp, _index_path())
+
+
+def _store(payload, suffix):
+    """Write *payload* under its content hash and return the path."""
+    digest = hashlib.blake2b(payload, digest_size=12).hexdigest()
+    path = ASSET_DIR / f"{digest}{suffix}"
+    if not path.exists():
+        ASSET_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+    return path
+
+
+def _fetch(name, asset):
+    if offline() or time.monotonic() - _failed.get(name, -RETRY_AFTER) < RETRY_AFTER:
+        return None
+    import requests
+
+    try:
+        response = requests.get(asset.url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning("could not fetch %s from %s: %s", name, asset.url, e)
+        _failed[name] = time.monotonic()
+        return None
+    return response.content
+
+
+def resolve(name):
+    """Local path of the original image for *name*, or None if it is unavailable."""
+    asset = ASSETS[name]
+    with _lock:
+        index = _read_index()
+        cached = index.get(name)
+        if cached and (ASSET_DIR / cached).exists():
+            return ASSET_DIR / cached
+
+        payload = _fetch(name, asset) if asset.url else None
+        if payload is not None:
+            suffix = os.path.splitext(asset.url)[1] or ".img"
+        elif asset.bundled and (ROOT / asset.bundled).exists():
+            payload = (ROOT / asset.bundled).read_bytes()
+            suffix = os.path.splitext(asset.bundled)[1]
+        else:
+            return None
+        path = _store(payload, suffix)
+        index[name] = path.name
+        _write_index(index)
+        return path
+
+
+def variants(name):
+    """``{width: path}`` of variants for *name*, up to and including its full width (or ``MAX_WIDTH``)."""
+    if name in _variants:
+        return _variants[name]
+    original = resolve(name)
+    if original is None:
+        return {}
+    with Image.open(original) as image:
+        full_width = min(image.width, MAX_WIDTH)
+        alpha = "A" in image.getbands() or "transparency" in image.info
+        suffix = ".png" if alpha else ".jpg"
+        result = {}
+        for width in [w for w in WIDTHS if w < full_width] + [full_width]:
+            path = ASSET_DIR / f"{original.stem}-{width}{suffix}"
+            if not path.exists():
+                height = round(image.height * width / image.width)
+                resized = image.convert("RGBA" if alpha else "RGB")
+                resized = resized.resize((width, height), Image.LANCZOS)
+                buf = io.BytesIO()
+                if alpha:
+                    resized.save(buf, "PNG", optimize=True)
+                else:
+                    resized.save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                tmp = path.with_suffix(f".tmp{os.getpid()}")
+                tmp.write_bytes(buf.getvalue())
+                os.replace(tmp, path)
+            result[width] = path
+    _variants[name] = result
+    return result
+
+
+def best(name, width=COLUMN_WIDTH, density=2):
+    """Smallest variant at least ``width * density`` pixels wide (or the largest there is)."""
+    available = variants(name)
+    if not available:
+        return None
+    wide_enough = [w for w in available if w >= width * density]
+    return available[min(wide_enough) if wide_enough else max(available)]
+
+
+def show(name, caption=None, width=COLUMN_WIDTH):
+    """``st.image`` for a registered asset, with a note instead of a broken image if it is unavailable."""
+    import streamlit as st
+
+    with perf.span(f"image: {name}", "image"):
+        perf.cache_status("memory" if name in _variants else "miss")
+        path = best(name, width)
+    if path is None:
+        st.caption(f"[Image unavailable: {caption or name}]")
+    else:
+        st.image(str(path), caption=caption)
+
+
+if __name__ == "__main__":
+    # python -m datastory.assets: fetch and pre-generate every variant (e.g. at image build time)
+    for asset_name in ASSETS:
+        sizes = variants(asset_name)
+        summary = ", ".join(f"{w}px {p.stat().st_size // 1024} KB" for w, p in sorted(sizes.items()))
+        print(f"{asset_name}: {summary or 'unavailable'}", file=sys.stderr)
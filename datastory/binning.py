@@ -0,0 +1,97 @@
+"""Weighted-sample binning for count-valued crosstabs (number of close friends).
+
+A crosstab such as "number of close friends by sex" is a weighted sample:
+each response value (0, 1, 2, ... 75 friends) carries one count per sex.
+:class:`WeightedSample` keeps the values sorted with a running total per
+group, so any histogram is two ``searchsorted`` lookups and a subtraction,
+O(bins) no matter how many response columns there are. Weighted means and
+percentiles come from the same running totals.
+"""
+import numpy as np
+import pandas as pd
+
+# response labels that stand for a number in the GSS exports
+VALUE_LABELS = {"No other close friends": 0}
+
+
+class WeightedSample:
+    def __init__(self, values, weights, groups):
+        values = np.asarray(values, dtype=np.float64)
+        order = np.argsort(values, kind="stable")
+        self.values = values[order]
+        self.weights = np.asarray(weights, dtype=np.float64)[:, order]
+        self.groups = list(groups)
+        # cumulative[g, k] is the total weight of the first k values
+        self.cumulative = np.zeros((len(self.groups), len(self.values) + 1))
+        np.cumsum(self.weights, axis=1, out=self.cumulative[:, 1:])
+
+    @classmethod
+    def from_crosstab(cls, engine, name, value_labels=VALUE_LABELS):
+        """Build from a crosstab whose categories are numbers (or labels in *value_labels*)."""
+        categories = engine.categories[name]
+        values = [value_labels[c] if c in value_labels else float(c) for c in categories]
+        return cls(values, engine.view(name), engine.sexes)
+
+    @property
+    def totals(self):
+        return self.cumulative[:, -1]
+
+    def histogram(self, edges):
+        """Weight per group falling in each ``[edges[i], edges[i + 1])`` bin, shape (groups, bins)."""
+        idx = np.searchsorted(self.values, np.asarray(edges, dtype=np.float64), side="left")
+        return self.cumulative[:, idx[1:]] - self.cumulative[:, idx[:-1]]
+
+    def frame(self, edges):
+        """:meth:`histogram` as a (bin label x group) frame, ready for a grouped bar chart."""
+        return pd.DataFrame(self.histogram(edges).T, index=bin_labels(edges), columns=self.groups)
+
+    def mean(self):
+        # NaN for a group with no weight, e.g. an empty slice of the survey
+        totals = np.where(self.totals > 0, self.totals, np.nan)
+        return (self.weights @ self.values) / totals
+
+    def percentile(self, q):
+        """Weighted percentile(s) per group, using the lower value at ties (no interpolation)."""
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        targets = self.totals[:, None] * q[None, :] / 100
+        # first value whose running total reaches the target, for every group and q at once
+        reached = self.cumulative[:, None, 1:] >= targets[:, :, None] - 1e-9
+        # NaN for a group with no weight, like the mean
+        return np.where(self.totals[:, None] > 0, self.values[reached.argmax(axis=2)], np.nan)
+
+    def median(self):
+        return self.percentile(50)[:, 0]
+
+    def summary(self, q=(25, 50, 75)):
+        """Mean and percentiles per group as a small frame."""
+        table = pd.DataFrame(self.percentile(q), index=self.groups, columns=[f"p{int(p)}" for p in q])
+        table.insert(0, "mean", self.mean())
+        return table
+
+    # bin edge helpers; edges always start at the smallest value and end past the largest
+
+    def fixed_edges(self, width):
+        low, high = self.values[0], self.values[-1]
+        return np.arange(low, low + (np.floor((high - low) / width) + 1) * width + width / 2, width)
+
+    def log_edges(self, bins):
+        """Log-spaced integer edges, with zero kept as its own bin."""
+        high = self.values[-1] + 1
+        return np.unique(np.concatenate([[0], np.round(np.geomspace(1, high, bins)), [high]]))
+
+    def quantile_edges(self, bins):
+        """Edges at pooled weighted quantiles, so each bin holds roughly the same weight."""
+        pooled = WeightedSample(self.values, self.weights.sum(axis=0, keepdims=True), ["all"])
+        inner = pooled.percentile(np.linspace(0, 100, bins + 1)[1:-1])[0]
+        # no weight at all (an empty slice): one bin over every value
+        inner = inner[~np.isnan(inner)]
+        return np.unique(np.concatenate([[self.values[0]], inner, [self.values[-1] + 1]]))
+
+
+def bin_labels(edges):
+    """``0-9`` style labels for integer edges, ``[a, b)`` otherwise."""
+    edges = np.asarray(edges, dtype=np.float64)
+    if np.all(edges == np.round(edges)):
+        edges = edges.astype(int)
+        return [f"{lo}" if hi - lo == 1 else f"{lo}-{hi - 1}" for lo, hi in zip(edges[:-1], edges[1:])]
+    return [f"[{lo:g}, {hi:g})" for lo, hi in zip(edges[:-1], edges[1:])]
@@ -0,0 +1,291 @@
+"""Render cache for the story's matplotlib charts.
+
+Every chart is keyed on a hash of the data it plots plus its styling
+parameters, and the encoded image bytes are kept in a bounded in-memory LRU
+(with an optional on-disk tier under ``.cache/charts``). Identical charts are
+served straight from the cache instead of being redrawn on every rerun.
+
+Charts are drawn on object-oriented ``Figure``s with their own Agg canvas,
+never through pyplot, so no global registry holds on to them, and each
+figure's renderer is freed as soon as the chart is encoded. Plotting memory
+per process is bounded by the cache (``DATASTORY_CHART_CACHE_MB``, 32 MB by
+default) plus one canvas of at most ``MAX_CANVAS_PIXELS``, since charts are
+drawn one at a time. bench/soak.py checks that memory stays flat over
+thousands of redraws.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from PIL import Image
+
+from datastory import perf
+from datastory.assets import MAX_WIDTH
+from datastory.loading import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# what st.pyplot uses, so cached images look the same as before
+SAVEFIG_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+# savefig formats fit_width scales down, and their PIL names
+RASTER_FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG"}
+
+
+def data_hash(data):
+    """Stable digest of a DataFrame/Series (values, index, columns and dtypes)."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+        if isinstance(data, pd.DataFrame):
+            digest.update(repr(list(data.columns)).encode())
+            digest.update(repr(list(data.dtypes.astype(str))).encode())
+        else:
+            digest.update(repr((data.name, str(data.dtype))).encode())
+    else:
+        digest.update(repr(data).encode())
+    return digest.hexdigest()
+
+
+def chart_key(kind, data, fmt, style):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(kind.encode())
+    digest.update(data_hash(data).encode())
+    digest.update(fmt.encode())
+    digest.update(repr(sorted(style.items())).encode())
+    digest.update(repr((SAVEFIG_OPTIONS, MAX_WIDTH)).encode())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Bounded LRU of encoded chart images, with an optional disk tier."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key, fmt):
+        return self.disk_dir / f"{key}.{fmt}"
+
+    def get(self, key, fmt):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                perf.cache_status("memory")
+                return payload
+        if self.disk_dir is not None:
+            try:
+                payload = self._disk_path(key, fmt).read_bytes()
+            except OSError:
+                payload = None
+            if payload is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                perf.cache_status("disk")
+                self._remember(key, payload)
+                return payload
+        with self._lock:
+            self.misses += 1
+        perf.cache_status("miss")
+        return None
+
+    def put(self, key, fmt, payload):
+        self._remember(key, payload)
+        if self.disk_dir is not None:
+            path = self._disk_path(key, fmt)
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".tmp{os.getpid()}")
+                tmp.write_bytes(payload)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+
+    def _remember(self, key, payload):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = payload
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= len(old)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+cache = RenderCache(
+    max_bytes=int(float(os.environ.get("DATASTORY_CHART_CACHE_MB", 32)) * 2**20),
+    disk_dir=None if os.environ.get("DATASTORY_CHART_DISK_CACHE") == "0" else CACHE_DIR / "charts",
+)
+# the largest canvas a chart is drawn on (RGBA, 4 bytes a pixel); bigger figures get a lower dpi
+MAX_CANVAS_PIXELS = 4_000_000
+# matplotlib's font and text caches are shared, and drawing one chart at a time
+# keeps plotting to a single canvas on top of the cache
+_draw_lock = threading.Lock()
+
+
+def render(kind, data, draw, fmt="png", figsize=None, **style):
+    """Return encoded image bytes for ``draw(ax, data, **style)``, drawing only on a cache miss."""
+    with perf.span(f"chart: {style.get('title', kind)}", "chart"):
+        key = chart_key(kind, data, fmt, dict(style, figsize=figsize))
+        payload = cache.get(key, fmt)
+        if payload is None:
+            payload = _draw(kind, key, data, draw, fmt, figsize, style)
+    return payload
+
+
+def figure(figsize=None):
+    """A Figure on its own Agg canvas, outside pyplot's figure registry.
+
+    Nothing but the caller refers to it, so it can be freed as soon as the
+    chart is encoded, see :func:`release`. matplotlib is only imported by the
+    first chart that has to be drawn; most come from the cache, so a new
+    instance usually never imports it at all.
+    """
+    import matplotlib
+
+    # pandas' plotting imports pyplot, which must not pick an interactive backend
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def release(fig):
+    """Free *fig*'s artists and pixel buffer now instead of at the next garbage collection."""
+    fig.clear()
+    # the renderer holds the full-size RGBA buffer, and the figure and canvas
+    # refer to each other, so only the cycle collector would free it otherwise
+    if hasattr(fig.canvas, "renderer"):
+        del fig.canvas.renderer
+
+
+def savefig_options(fig):
+    """``SAVEFIG_OPTIONS``, with the dpi lowered if *fig*'s canvas would exceed ``MAX_CANVAS_PIXELS``."""
+    width, height = fig.get_size_inches()
+    pixels = width * height * SAVEFIG_OPTIONS["dpi"] ** 2
+    if pixels <= MAX_CANVAS_PIXELS:
+        return SAVEFIG_OPTIONS
+    return dict(SAVEFIG_OPTIONS, dpi=float(SAVEFIG_OPTIONS["dpi"] * (MAX_CANVAS_PIXELS / pixels) ** 0.5))
+
+
+def _draw(kind, key, data, draw, fmt, figsize, style):
+    with _draw_lock:
+        fig = figure(figsize)
+        try:
+            draw(fig.subplots(), data, **style)
+            with io.BytesIO() as buf:
+                fig.savefig(buf, format=fmt, **savefig_options(fig))
+                payload = buf.getvalue()
+        finally:
+            release(fig)
+    payload = fit_width(payload, fmt)
+    cache.put(key, fmt, payload)
+    logger.info("chart cache miss for %s %s: %s", kind, key[:8], cache.stats())
+    return payload
+
+
+def fit_width(payload, fmt, width=MAX_WIDTH):
+    """*payload* scaled down to at most *width* pixels, once, instead of by ``st.image`` on every run.
+
+    Only raster formats are scaled; vector output such as SVG is returned as it is.
+    """
+    pil_format = RASTER_FORMATS.get(fmt.lower())
+    if pil_format is None:
+        return payload
+    with Image.open(io.BytesIO(payload)) as image:
+        if image.width <= width:
+            return payload
+        height = round(image.height * width / image.width)
+        buf = io.BytesIO()
+        image.resize((width, height), Image.LANCZOS).save(buf, format=pil_format, optimize=True)
+    return buf.getvalue()
+
+
+def _draw_line(ax, df, x, y, label, title, xlabel, ylabel, grid=False, rotate_xticks=0):
+    ax.plot(df[x], df[y], label=label, color="b", marker="o", linestyle="-")
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    if rotate_xticks:
+        ax.tick_params(axis="x", rotation=rotate_xticks)
+    if grid:
+        ax.grid(True)
+    ax.legend()
+
+
+def line_chart(df, x, y, label, title, xlabel, ylabel, figsize=None, grid=False, rotate_xticks=0):
+    """Single-series line chart with markers, as used for the happiness trends."""
+    return render(
+        "line", df[[x, y]], _draw_line, figsize=figsize,
+        x=x, y=y, label=label, title=title, xlabel=xlabel, ylabel=ylabel,
+        grid=grid, rotate_xticks=rotate_xticks,
+    )
+
+
+def _draw_bars(ax, df, title, xlabel, ylabel):
+    df.plot(kind="bar", ax=ax)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel(xlabel)
+    ax.legend(title="Gender")
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha="right")
+
+
+def bar_chart(df, title, xlabel, ylabel, figsize=(10, 6)):
+    """Grouped bar chart of a (category x gender) frame, one bar colour per gender."""
+    return render("bar", df, _draw_bars, figsize=figsize, title=title, xlabel=xlabel, ylabel=ylabel)
+
+
+def _draw_lines(ax, df, title, xlabel, ylabel, legend_title):
+    import matplotlib
+
+    if df.shape[1] > 10:
+        # the default cycle repeats after 10 colours
+        ax.set_prop_cycle(color=matplotlib.colormaps["tab20"].colors)
+    for column in df.columns:
+        ax.plot(df.index, df[column], label=column, marker="o", linestyle="-")
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.legend(title=legend_title, fontsize="small", ncol=2 if df.shape[1] > 8 else 1)
+
+
+def multi_line_chart(df, title, xlabel, ylabel, legend_title=None, figsize=None):
+    """One line per column of *df*, against its index."""
+    return render(
+        "lines", df, _draw_lines, figsize=figsize,
+        title=title, xlabel=xlabel, ylabel=ylabel, legend_title=legend_title,
+    )
@@ -0,0 +1,86 @@
+"""Country index over the World Happiness data.
+
+Every happiness release (see datastory/releases.py) is merged once into a single frame sorted by country
+(and year), with each country's rows at ``offsets[code]:offsets[code + 1]``.
+Selecting a country is therefore a slice rather than a boolean scan of the
+whole table. Each metric is also kept as a dense float32 (country x year)
+matrix, so overlaying N countries is one fancy-index into that matrix.
+"""
+import numpy as np
+import pandas as pd
+
+from datastory import loading, releases
+
+METRICS = ["Ladder score", "Social support"]
+# every measure in the consolidated series
+ALL_METRICS = list(releases.SERIES["happiness"].columns)
+
+
+class CountryIndex:
+    def __init__(self, df, column="Country name", metrics=METRICS):
+        codes, countries = pd.factorize(df[column], sort=True)
+        order = np.lexsort((df["year"].to_numpy(), codes))
+        self.frame = df.iloc[order].reset_index(drop=True)
+        self.frame[column] = pd.Categorical.from_codes(codes[order], countries)
+        self.countries = list(countries)
+        self.codes = {name: code for code, name in enumerate(self.countries)}
+        self.offsets = np.searchsorted(codes[order], np.arange(len(self.countries) + 1))
+
+        self.years = np.unique(self.frame["year"].to_numpy()).astype(int)
+        row_codes = codes[order]
+        year_pos = np.searchsorted(self.years, self.frame["year"].to_numpy())
+        self.matrices = {}
+        for metric in metrics:
+            matrix = np.full((len(self.countries), len(self.years)), np.nan, dtype=np.float32)
+            matrix[row_codes, year_pos] = self.frame[metric].to_numpy()
+            matrix.setflags(write=False)
+            self.matrices[metric] = matrix
+
+    def rows(self, country):
+        """All rows for *country* (a slice of the sorted frame)."""
+        code = self.codes[country]
+        return self.frame.iloc[self.offsets[code]: self.offsets[code + 1]]
+
+    def panel(self, countries, metric, start=None, end=None):
+        """(year x country) frame of *metric* for the chosen countries."""
+        codes = [self.codes[c] for c in countries]
+        lo = 0 if start is None else np.searchsorted(self.years, start, side="left")
+        hi = len(self.years) if end is None else np.searchsorted(self.years, end, side="right")
+        return pd.DataFrame(
+            self.matrices[metric][codes, lo:hi].T, index=self.years[lo:hi], columns=list(countries)
+        )
+
+
+def harmonize(metrics=METRICS, comparable=False):
+    """Every happiness release as one (country, year, *metrics*) frame.
+
+    Apart from the ladder score, the single-year reports (such as the 2024
+    one) give each factor's contribution to the ladder score rather than the
+    survey measure itself; with *comparable* those values are left out (NaN).
+    """
+    full_df = loading.load("happiness")
+    if comparable:
+        full_df = releases.comparable(full_df)
+    full_df = full_df[["Country name", "year"] + metrics]
+    return full_df.assign(year=full_df["year"].astype(float))
+
+
+def _build_index():
+    # contribution-scale values would share an axis with the survey-scale ones
+    return CountryIndex(harmonize(comparable=True))
+
+
+def index():
+    """The shared country index, rebuilt only when a happiness release is added or changed."""
+    return loading.derived("country_index", ("happiness",), _build_index)
+
+
+def trend(country, start=2010, end=None):
+    """Ladder score and social support for one country between *start* and *end* (the latest year).
+
+    Values not on the survey's own scale are NaN, see :func:`harmonize`.
+    """
+    rows = index().rows(country)
+    years = rows["year"].to_numpy()
+    lo, hi = np.searchsorted(years, [start, np.inf if end is None else end + 1])
+    return rows.iloc[lo:hi][["year"] + METRICS]
@@ -0,0 +1,72 @@
+"""Stacked crosstab engine for the story's gender crosstabs.
+
+Every survey variable is held in one ``(variable, sex, category)`` count
+array. Each variable's response categories are left-aligned along the last
+axis and padded with zeros, so variables with different category sets (the
+extra "lives in the same household" answer for visiting, for example) share
+a single array. Row percentages and column percentages for all variables
+are computed in one batched operation when the engine is built. Charts then
+read read-only views of these arrays instead of reshaping their own copies.
+Counts are int32 and percentages float32.
+"""
+import numpy as np
+import pandas as pd
+
+SEX_COLUMN = "SEX (respondents sex)"
+SEXES = ("MALE", "FEMALE")
+
+
+class CrosstabEngine:
+    """Counts and percentages for a set of GSS crosstabs, stacked into arrays.
+
+    *tables* maps a short name to a crosstab in the GSS export shape: a
+    ``SEX (respondents sex)`` column, one column per response and a
+    ``Total`` column, with a row per sex plus a ``Total`` row.
+    """
+
+    def __init__(self, tables, sexes=SEXES):
+        self.names = list(tables)
+        self.sexes = list(sexes)
+        self.categories = {}
+        for name, table in tables.items():
+            self.categories[name] = [c for c in table if c not in (SEX_COLUMN, "Total")]
+
+        width = max(len(c) for c in self.categories.values())
+        shape = (len(self.names), len(self.sexes), width)
+        self.counts = np.zeros(shape, dtype=np.int32)
+        # the Total column as reported by the export, which can differ from the row sum by rounding
+        self.totals = np.zeros(shape[:2], dtype=np.int32)
+        self.mask = np.zeros((shape[0], width), dtype=bool)
+        for v, name in enumerate(self.names):
+            table = tables[name]
+            rows = [list(table[SEX_COLUMN]).index(sex) for sex in self.sexes]
+            categories = self.categories[name]
+            self.counts[v, :, : len(categories)] = np.array([table[c] for c in categories]).T[rows]
+            self.totals[v] = np.asarray(table["Total"])[rows]
+            self.mask[v, : len(categories)] = True
+
+        # percentages for every variable at once; padded slots stay at zero
+        self.row_pct = np.divide(
+            self.counts, self.totals[:, :, None], out=np.zeros(shape, dtype=np.float32),
+            where=self.totals[:, :, None] > 0,
+        )
+        self.row_pct *= 100
+        self.category_totals = self.counts.sum(axis=1, dtype=np.int32)
+        self.col_pct = np.divide(
+            self.counts, self.category_totals[:, None, :], out=np.zeros(shape, dtype=np.float32),
+            where=self.category_totals[:, None, :] > 0,
+        )
+        self.col_pct *= 100
+        for array in (self.counts, self.totals, self.mask, self.row_pct, self.category_totals, self.col_pct):
+            array.setflags(write=False)
+
+    def view(self, name, kind="counts"):
+        """``(sex, category)`` view of one variable; *kind* is counts, row_pct or col_pct."""
+        v = self.names.index(name)
+        return getattr(self, kind)[v, :, : len(self.categories[name])]
+
+    def frame(self, name, kind="counts"):
+        """One variable as a (category x sex) frame backed by the engine's arrays."""
+        return pd.DataFrame(
+            self.view(name, kind).T, index=self.categories[name], columns=self.sexes, copy=False
+        )
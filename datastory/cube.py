@@ -0,0 +1,201 @@
+"""Precomputed count cube over the GSS microdata, for instant year-range and subgroup slices.
+
+    python -m datastory.cube        # build the cube ahead of time (e.g. at deploy)
+
+Respondents in the microdata store (see datastory/microdata.py) are counted
+once per ``(item, year, age band, sex, response)`` and the counts are kept
+cumulatively along the year axis, so the counts for any range of years are a
+single subtraction, ``prefix[last + 1] - prefix[first]``, however many years
+it spans. Further dimensions go between the year and sex axes like the age
+band does.
+
+The cube is saved as an int32 ``.npy`` under ``.cache/``, named after the
+content hash of the ingested file, and memory-mapped read-only, so every
+session (and every worker process on the machine) reads the same pages.
+"""
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from datastory import microdata, perf
+from datastory.loading import CACHE_DIR
+
+VERSION = 1
+SEXES = ("MALE", "FEMALE")
+# (label, youngest age); respondents without an age get a band of their own, UNKNOWN_AGE, after these
+AGE_BANDS = [("18-29", 18), ("30-44", 30), ("45-64", 45), ("65+", 65)]
+UNKNOWN_AGE = "Age unknown"
+YEARS_KEY = "gss_years"
+BANDS_KEY = "gss_age_bands"
+
+_cubes = {}
+_lock = threading.Lock()
+
+
+class CountCube:
+    """Year-cumulative counts, memory-mapped from *path* (an ``.npy`` with a ``.json`` of axis labels)."""
+
+    def __init__(self, path):
+        meta = json.loads(path.with_suffix(".json").read_text())
+        self.years = list(range(meta["first_year"], meta["last_year"] + 1))
+        self.bands = meta["bands"]
+        self.sexes = meta["sexes"]
+        self.names = meta["names"]
+        self.labels = meta["labels"]
+        self.numeric = meta["numeric"]
+        # (item, year + 1, band, sex, response), prefix[:, 0] is all zeros
+        self.prefix = np.load(path, mmap_mode="r")
+
+    def counts(self, name, years=None, bands=None):
+        """``(label x sex)`` counts for item *name* over the inclusive *years* and the age *bands* (all if empty)."""
+        if name not in self.names:
+            # not in the ingested file: no counts, like Store.counts
+            return pd.DataFrame(columns=self.sexes, dtype=np.int64)
+        v = self.names.index(name)
+        first, last = years or (self.years[0], self.years[-1])
+        lo = min(max(first - self.years[0], 0), len(self.years))
+        hi = min(max(last - self.years[0] + 1, lo), len(self.years))
+        window = self.prefix[v, hi] - self.prefix[v, lo]
+        if bands:
+            window = window[[self.bands.index(b) for b in bands]]
+        labels = self.labels[name]
+        frame = pd.DataFrame(window.sum(axis=0)[:, : len(labels)].T, index=labels, columns=self.sexes)
+        return frame[frame.sum(axis=1) > 0] if self.numeric[name] else frame
+
+    def tables(self, years=None, bands=None, categories=None):
+        """Export-shaped crosstabs for :class:`~datastory.crosstab.CrosstabEngine`.
+
+        With *categories* (``{name: [category, ...]}``) just those items, in that
+        order; otherwise every item. Items the ingested file lacks get zero
+        counts over their categories.
+        """
+        if categories is None:
+            categories = dict.fromkeys(self.names)
+        return {
+            name: microdata.export_table(self.counts(name, years, bands), name, order)
+            for name, order in categories.items()
+        }
+
+
+def _age_band(age):
+    bounds = np.array([youngest for _, youngest in AGE_BANDS])
+    band = np.searchsorted(bounds, age, side="right") - 1
+    return np.where(band < 0, len(AGE_BANDS), band)
+
+
+def build(store, path):
+    """Count every item in *store* into a cube at *path*."""
+    import pyarrow.dataset as ds
+
+    schema = store.schema
+    first, last = min(schema["years"]), max(schema["years"])
+    n_years, n_bands = last - first + 1, len(AGE_BANDS) + 1
+    lookup = store.sex_lookup(SEXES)
+    age = schema.get("subgroups", {}).get("age")
+    names = list(schema["items"])
+    grids, labels, numeric = [], {}, {}
+    for name in names:
+        item = schema["items"][name]
+        column = item["column"]
+        width = 0 if item["numeric"] else len(item["labels"])
+        grid = np.zeros((n_years, n_bands, len(SEXES), width), dtype=np.int64)
+        condition = (ds.field(column) >= 0) & ds.field(microdata.SEX).isin(np.flatnonzero(lookup >= 0).tolist())
+        columns = [microdata.YEAR, microdata.SEX, column] + ([age] if age else [])
+        # batch by batch, so building needs no more memory than the cube itself
+        for batch in store.dataset.to_batches(columns=columns, filter=condition):
+            year = batch.column(microdata.YEAR).to_numpy() - first
+            sex = lookup[batch.column(microdata.SEX).to_numpy()]
+            codes = batch.column(column).to_numpy().astype(np.int64)
+            band = _age_band(batch.column(age).to_numpy()) if age else np.full(len(codes), n_bands - 1)
+            if len(codes) and codes.max() >= grid.shape[-1]:
+                grid = np.pad(grid, [(0, 0)] * 3 + [(0, int(codes.max()) + 1 - grid.shape[-1])])
+            index = ((year * n_bands + band) * len(SEXES) + sex) * grid.shape[-1] + codes
+            grid += np.bincount(index, minlength=grid.size).reshape(grid.shape)
+        grids.append(grid)
+        labels[name] = [str(v) for v in range(grid.shape[-1])] if item["numeric"] else item["labels"]
+        numeric[name] = item["numeric"]
+
+    width = max((g.shape[-1] for g in grids), default=0)
+    prefix = np.zeros((len(names), n_years + 1, n_bands, len(SEXES), width), dtype=np.int32)
+    for v, grid in enumerate(grids):
+        np.cumsum(grid, axis=0, out=prefix[v, 1:, ..., : grid.shape[-1]])
+
+    meta = {
+        "version": VERSION, "first_year": first, "last_year": last,
+        "bands": [label for label, _ in AGE_BANDS] + [UNKNOWN_AGE], "sexes": list(SEXES),
+        "names": names, "labels": labels, "numeric": numeric,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # both files atomically, the labels first: a cube only counts as built once its .npy is in place
+    tmp_meta = path.with_name(f"{path.stem}.tmp{os.getpid()}.json")
+    tmp_meta.write_text(json.dumps(meta))
+    os.replace(tmp_meta, path.with_suffix(".json"))
+    tmp = path.with_name(f"{path.stem}.tmp{os.getpid()}.npy")
+    np.save(tmp, prefix)
+    os.replace(tmp, path)
+    return path
+
+
+def available():
+    return microdata.available()
+
+
+def load():
+    """The cube for the current microdata store, built on first use and then shared by every session."""
+    store = microdata.store()
+    path = CACHE_DIR / f"gss-cube-{VERSION}-{store.schema['source']['hash']}.npy"
+    cube = _cubes.get(path)
+    if cube is None:
+        with _lock, perf.span("cube: load", "data"):
+            cube = _cubes.get(path)
+            if cube is None:
+                perf.cache_status("disk" if path.exists() else "miss")
+                if not path.exists():
+                    build(store, path)
+                    # only the cube for the current store is kept
+                    for stale in CACHE_DIR.glob("gss-cube-*"):
+                        if stale.stem != path.stem:
+                            stale.unlink(missing_ok=True)
+                cube = _cubes[path] = CountCube(path)
+    return cube
+
+
+def _default_years():
+    # the years of the story's own tables; gss builds its crosstabs on import, so only once there is a store
+    from datastory import gss
+
+    return gss.YEARS
+
+
+def controls():
+    """Sidebar year range and age filters for the GSS charts; nothing without a microdata store."""
+    if not available():
+        return
+    import streamlit as st
+
+    cube = load()
+    first, last = cube.years[0], cube.years[-1]
+    default_years = _default_years()
+    default = (max(first, min(default_years[0], last)), min(last, max(default_years[1], first)))
+    with st.sidebar.expander("GSS years and subgroups", expanded=True):
+        st.slider("Survey years", first, last, value=default, key=YEARS_KEY)
+        st.multiselect("Age", cube.bands, key=BANDS_KEY, placeholder="All ages")
+
+
+def selection():
+    """``(years, age bands)`` picked in the sidebar; ``(None, ())`` for the story's defaults."""
+    import streamlit as st
+
+    years = st.session_state.get(YEARS_KEY)
+    return (tuple(years) if years else None), tuple(st.session_state.get(BANDS_KEY, ()))
+
+
+if __name__ == "__main__":
+    if not available():
+        sys.exit(f"no microdata store at {microdata.STORE_DIR}, run python -m datastory.microdata ingest first")
+    built = load()
+    print(f"{built.prefix.shape} cube, {built.prefix.nbytes / 1024:.0f} KB", file=sys.stderr)
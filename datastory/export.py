@@ -0,0 +1,304 @@
+"""Static export of the story, for serving it from a plain file server or CDN.
+
+    python -m datastory.export out/            # build or update the bundle in out/
+    python -m datastory.export out/ --force    # rebuild every section
+
+Each section script runs once against :class:`StaticPage`, a stand-in for
+the ``streamlit`` module that records the Markdown, charts, images and
+tables as HTML instead of sending them to a browser. Widgets are recorded
+at their default values, so the export shows what a first-time reader sees.
+
+Images and the stylesheet are written to ``static/`` under content-hashed
+names and can be cached forever; the section pages themselves keep stable
+names (``index.html`` is the first section). ``manifest.json`` records the
+inputs each section used (the code, and the data sources and images it
+loaded), so a rebuild only re-runs the sections whose inputs changed.
+The live Streamlit app stays the authoring path.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import sys
+import textwrap
+from pathlib import Path
+
+import pandas as pd
+
+from datastory import assets, loading, microdata, perf
+from datastory.loading import ROOT
+from datastory.story import PAGE_TITLE, SECTIONS
+
+# bump when the page template or the recorder change
+VERSION = 1
+STATIC_DIR = "static"
+
+STYLE = """\
+body { margin: 0; font-family: "Source Sans Pro", system-ui, sans-serif; color: #31333f; line-height: 1.6; }
+nav { background: #f0f2f6; padding: 0.75rem 1rem; }
+nav a { margin-right: 1rem; color: #31333f; }
+nav a.current { font-weight: 600; }
+main { max-width: 704px; margin: 0 auto; padding: 1rem 1rem 4rem; }
+img { max-width: 100%; height: auto; }
+figure { margin: 1rem 0; }
+figcaption, .caption { color: #808495; font-size: 0.875rem; }
+table { border-collapse: collapse; font-size: 0.875rem; }
+th, td { border: 1px solid #e6e9ef; padding: 0.25rem 0.5rem; text-align: right; }
+.widget { background: #f0f2f6; border-radius: 0.5rem; padding: 0.25rem 0.75rem; font-size: 0.875rem; }
+.next { display: block; margin-top: 2rem; }
+"""
+
+TEMPLATE = """\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title} - {page_title}</title>
+<link rel="stylesheet" href="{style}">
+</head>
+<body>
+<nav>{nav}</nav>
+<main>
+{body}
+{next}
+</main>
+</body>
+</html>
+"""
+
+
+def _digest(payload):
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def _markdown(text, inline=False, unsafe_allow_html=False):
+    import markdown
+
+    text = textwrap.dedent(text).strip()
+    if not unsafe_allow_html:
+        # like Streamlit, show raw HTML as text unless it was allowed
+        text = text.replace("<", "&lt;")
+    rendered = markdown.markdown(text, extensions=["tables"])
+    if inline and rendered.startswith("<p>") and rendered.endswith("</p>"):
+        rendered = rendered[3:-4]
+    return rendered
+
+
+class StaticPage:
+    """Records the ``st.*`` calls the sections make as HTML blocks."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.blocks = []
+        self.files = set()
+        self.session_state = {}
+        self.query_params = {}
+
+    def _static(self, payload, stem, suffix):
+        name = f"{stem}.{_digest(payload)}{suffix}"
+        path = self.out_dir / STATIC_DIR / name
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(payload)
+        self.files.add(name)
+        return f"{STATIC_DIR}/{name}"
+
+    # text
+
+    def title(self, body):
+        self.blocks.append(f"<h1>{_markdown(body, inline=True)}</h1>")
+
+    def header(self, body):
+        self.blocks.append(f"<h2>{_markdown(body, inline=True)}</h2>")
+
+    def subheader(self, body):
+        self.blocks.append(f"<h3>{_markdown(body, inline=True)}</h3>")
+
+    def markdown(self, body, unsafe_allow_html=False):
+        self.blocks.append(_markdown(body, unsafe_allow_html=unsafe_allow_html))
+
+    def caption(self, body):
+        self.blocks.append(f'<p class="caption">{_markdown(body, inline=True)}</p>')
+
+    def info(self, body):
+        self.blocks.append(f'<p class="widget">{_markdown(body, inline=True)}</p>')
+
+    def write(self, *args, unsafe_allow_html=False):
+        for arg in args:
+            if isinstance(arg, (pd.DataFrame, pd.Series)):
+                self.dataframe(arg)
+            else:
+                self.markdown(str(arg), unsafe_allow_html=unsafe_allow_html)
+
+    # media
+
+    def image(self, image, caption=None):
+        if isinstance(image, bytes):
+            src = self._static(image, "chart", ".png")
+        else:
+            path = Path(image)
+            src = self._static(path.read_bytes(), "image", path.suffix)
+        alt = html.escape(caption or "", quote=True)
+        figcaption = f"<figcaption>{html.escape(caption)}</figcaption>" if caption else ""
+        self.blocks.append(f'<figure><img src="{src}" alt="{alt}" loading="lazy">{figcaption}</figure>')
+
+    def dataframe(self, data, hide_index=None, **kwargs):
+        df = data if isinstance(data, (pd.DataFrame, pd.Series)) else pd.DataFrame(data)
+        self.blocks.append(df.to_html(border=0, index=not hide_index))
+
+    # widgets are frozen at their defaults
+
+    def _widget(self, label, value):
+        shown = ", ".join(map(str, value)) if isinstance(value, list) else value
+        self.blocks.append(
+            f'<p class="widget">{html.escape(label)}: <strong>{html.escape(str(shown))}</strong>'
+            " (interactive in the live story)</p>"
+        )
+        return value
+
+    def radio(self, label, options, index=0, **kwargs):
+        return self._widget(label, list(options)[index])
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        return self._widget(label, list(options)[index])
+
+    def slider(self, label, min_value=0, max_value=100, value=None, **kwargs):
+        return self._widget(label, min_value if value is None else value)
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return self._widget(label, list(default or []))
+
+    def fragment(self, func=None, **kwargs):
+        return func if func is not None else (lambda f: f)
+
+
+def _code_hash():
+    """Hash of what every section shares (this package, the section list and the GSS microdata store)."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr((VERSION, PAGE_TITLE, SECTIONS, STYLE, TEMPLATE)).encode())
+    for path in sorted((ROOT / "datastory").glob("*.py")):
+        digest.update(path.read_bytes())
+    if microdata.available():
+        digest.update(microdata.store().schema["source"]["hash"].encode())
+    return digest.hexdigest()
+
+
+def _inputs(script, deps, code):
+    """Fingerprint of a section: its script, the shared code and the sources and images it used."""
+    inputs = {"code": code, "script": loading.content_hash(ROOT / script)}
+    for name in deps.get("data", []):
+        inputs[f"data:{name}"] = loading.fingerprint(name)
+    for name in deps.get("images", []):
+        original = assets.resolve(name)
+        inputs[f"image:{name}"] = original.name if original else None
+    return inputs
+
+
+def _record(script, out_dir):
+    """Run *script* against a :class:`StaticPage` and return it with the inputs it used."""
+    page = StaticPage(out_dir)
+    real = sys.modules.get("streamlit")
+    sys.modules["streamlit"] = page
+    try:
+        # spans only, to see which sources and images the section loads
+        with perf.measure(f"export {script}", profile=True, allocations=False) as run:
+            source = (ROOT / script).read_text()
+            exec(compile(source, str(ROOT / script), "exec"), {"__name__": "__main__", "__file__": str(ROOT / script)})
+    finally:
+        if real is None:
+            del sys.modules["streamlit"]
+        else:
+            sys.modules["streamlit"] = real
+    deps = {"data": [], "images": []}
+    for span in run.spans:
+        kind, _, name = span["name"].partition(": ")
+        if kind == "load" and name not in deps["data"]:
+            deps["data"].append(name)
+        elif kind == "image" and name not in deps["images"]:
+            deps["images"].append(name)
+    return page, deps
+
+
+def _filename(i, url_path):
+    return "index.html" if i == 0 else f"{url_path}.html"
+
+
+def _write_page(out_dir, i, body, style):
+    _, title, url_path = SECTIONS[i]
+    nav = "".join(
+        f'<a href="{_filename(j, u)}"{" class=current" if j == i else ""}>{html.escape(t)}</a>'
+        for j, (_, t, u) in enumerate(SECTIONS)
+    )
+    following = ""
+    if i + 1 < len(SECTIONS):
+        _, next_title, next_url = SECTIONS[i + 1]
+        following = f'<a class="next" href="{_filename(i + 1, next_url)}">Next: {html.escape(next_title)} &rarr;</a>'
+    page = TEMPLATE.format(
+        title=html.escape(title), page_title=html.escape(PAGE_TITLE), style=style, nav=nav, body=body, next=following
+    )
+    path = out_dir / _filename(i, url_path)
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(page, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def export(out_dir, force=False):
+    """Build or update the static bundle in *out_dir*; returns the url paths of the rebuilt sections."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / "manifest.json"
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    previous = manifest.get("sections", {})
+
+    style_payload = STYLE.encode()
+    style = f"{STATIC_DIR}/style.{_digest(style_payload)}.css"
+    if not (out_dir / style).exists():
+        (out_dir / STATIC_DIR).mkdir(exist_ok=True)
+        (out_dir / style).write_bytes(style_payload)
+
+    code = _code_hash()
+    sections, rebuilt = {}, []
+    for i, (script, _, url_path) in enumerate(SECTIONS):
+        old = previous.get(url_path)
+        if not force and old is not None and (out_dir / _filename(i, url_path)).exists() \
+                and all((out_dir / STATIC_DIR / f).exists() for f in old["files"]) \
+                and _inputs(script, old["deps"], code) == old["inputs"]:
+            sections[url_path] = old
+            continue
+        page, deps = _record(script, out_dir)
+        _write_page(out_dir, i, "\n".join(page.blocks), style)
+        sections[url_path] = {
+            "page": _filename(i, url_path),
+            "inputs": _inputs(script, deps, code),
+            "deps": deps,
+            "files": sorted(page.files),
+        }
+        rebuilt.append(url_path)
+
+    # drop static files no page refers to any more
+    keep = {Path(style).name}.union(*(s["files"] for s in sections.values()))
+    for path in (out_dir / STATIC_DIR).iterdir():
+        if path.name not in keep:
+            path.unlink()
+
+    manifest = {"version": VERSION, "style": style, "sections": sections}
+    manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    return rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--force", action="store_true", help="rebuild every section")
+    args = parser.parse_args()
+    rebuilt = export(args.out_dir, args.force)
+    print(f"rebuilt {', '.join(rebuilt) or 'nothing'} in {args.out_dir}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
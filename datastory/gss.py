@@ -0,0 +1,192 @@
+"""GSS crosstabs used by the story (General Social Survey, 2010-2022, by sex).
+
+The GSS Data Explorer export did not come out usable in Excel, so these were
+typed in from its cross-tabulation view. Once the GSS microdata has been
+ingested (``python -m datastory.microdata ingest ...``), the same crosstabs
+are computed from it instead, see datastory/microdata.py, and the sidebar
+can re-slice them by survey year and age, see datastory/cube.py.
+"""
+import functools
+
+from datastory import cube, microdata
+from datastory.binning import WeightedSample
+from datastory.crosstab import SEX_COLUMN, CrosstabEngine
+
+# Evenings with Friends (SOCFREND)
+data_friends = {
+    "SEX (respondents sex)": ["MALE", "FEMALE", "Total"],
+    "ALMOST DAILY": [860, 668, 1528],
+    "SEV TIMES A WEEK": [3941, 3967, 7908],
+    "SEV TIMES A MNTH": [3988, 4562, 8551],
+    "ONCE A MONTH": [4369, 5037, 9406],
+    "SEV TIMES A YEAR": [4079, 4106, 8186],
+    "ONCE A YEAR": [1642, 1628, 3270],
+    "NEVER": [1813, 2434, 4247],
+    "Total": [20693, 22403, 43096]
+}
+
+# Spending Evenings at a Bar (SOCBAR)
+data_bar = {
+    "SEX (respondents sex)": ["MALE", "FEMALE", "Total"],
+    "ALMOST DAILY": [386, 101, 487],
+    "SEV TIMES A WEEK": [2118, 1050, 3168],
+    "SEV TIMES A MNTH": [1866, 1361, 3227],
+    "ONCE A MONTH": [2361, 2088, 4449],
+    "SEV TIMES A YEAR": [2671, 2747, 5418],
+    "ONCE A YEAR": [2495, 2718, 5214],
+    "NEVER": [8766, 12328, 21094],
+    "Total": [20663, 22394, 43057]
+}
+
+# Calling Best Friend
+data_bf_call = {
+    "SEX (respondents sex)": ["MALE", "FEMALE", "Total"],
+    "Daily": [69, 105, 173],
+    "At least several times a week": [145, 131, 275],
+    "At least once a week": [132, 111, 243],
+    "At least once a month": [80, 95, 175],
+    "Several times a year": [47, 34, 81],
+    "Less often": [39, 13, 52],
+    "Never": [29, 17, 46],
+    "Total": [541, 505, 1046]
+}
+
+# Visiting Best Friend
+data_interaction = {
+    "SEX (respondents sex)": ["MALE", "FEMALE", "Total"],
+    "He or she lives in the same household as I do": [18, 11, 29],
+    "Daily": [58, 44, 102],
+    "At least several times a week": [119, 95, 214],
+    "At least once a week": [133, 123, 256],
+    "At least once a month": [90, 102, 192],
+    "Several times a year": [82, 92, 174],
+    "Less often": [55, 42, 97],
+    "Never": [4, 7, 11],
+    "Total": [559, 516, 1075]
+}
+
+# Contributed to a Needy Friend
+data_needy_frd = {
+    "SEX (respondents sex)": ["MALE", "FEMALE", "Total"],
+    "YES": [194, 255, 449],
+    "NO": [479, 476, 955],
+    "Total": [673, 731, 1404]
+}
+
+# Number of Close Friends
+data_friends_count = {
+    "SEX (respondents sex)": ["MALE", "FEMALE", "Total"],
+    "No other close friends": [107, 76, 183],
+    "1": [35, 25, 60],
+    "2": [46, 55, 100],
+    "3": [65, 68, 133],
+    "4": [57, 38, 96],
+    "5": [64, 58, 122],
+    "6": [34, 24, 58],
+    "7": [8, 9, 16],
+    "8": [19, 16, 35],
+    "9": [5, 5, 10],
+    "10": [57, 58, 115],
+    "11": [0, 0, 0],
+    "12": [14, 10, 24],
+    "14": [1, 0, 1],
+    "15": [15, 27, 42],
+    "16": [0, 1, 1],
+    "18": [2, 1, 3],
+    "19": [0, 0, 0],
+    "20": [21, 18, 38],
+    "21": [1, 0, 1],
+    "24": [0, 2, 2],
+    "25": [17, 9, 26],
+    "30": [6, 11, 17],
+    "35": [4, 2, 6],
+    "40": [2, 1, 4],
+    "45": [0, 3, 3],
+    "50": [13, 10, 23],
+    "60": [1, 3, 5],
+    "70": [0, 1, 1],
+    "75": [1, 0, 1],
+    "Total": [597, 532, 1129]
+}
+
+# Romantic Partner
+data_romance = {
+    "SEX (respondents sex)": ["MALE", "FEMALE", "Total"],
+    "YES": [250, 257, 507],
+    "NO": [267, 382, 649],
+    "HAS SAME GENDER PARTNER": [2, 1, 3],
+    "Total": [519, 640, 1159]
+}
+
+TABLES = {
+    "friends": data_friends,
+    "bar": data_bar,
+    "bf_call": data_bf_call,
+    "interaction": data_interaction,
+    "needy_frd": data_needy_frd,
+    "friends_count": data_friends_count,
+    "romance": data_romance,
+}
+
+# the years the tables above cover
+YEARS = (2010, 2022)
+
+# response categories in the order the tables above list them
+CATEGORIES = {name: [c for c in table if c not in (SEX_COLUMN, "Total")] for name, table in TABLES.items()}
+
+if microdata.available():
+    # same crosstabs and category order, counted from the microdata store
+    TABLES = {name: microdata.store().crosstab(name, YEARS, CATEGORIES[name]) for name in TABLES}
+
+# every crosstab above, stacked into one engine shared by all sessions
+CROSSTABS = CrosstabEngine(TABLES)
+
+# number of close friends as a weighted sample, for re-binning on every slider move
+CLOSE_FRIENDS = WeightedSample.from_crosstab(CROSSTABS, "friends_count")
+
+
+# under the text of a section when the sidebar picks another slice than the tables above
+SLICE_NOTE = (
+    "The charts, tests and percentages follow the years and ages picked in the sidebar. The descriptions around "
+    "them were written for all respondents, 2010-2022."
+)
+
+
+def crosstabs(years=None, bands=()):
+    """Engine for a range of survey *years* and age *bands*, sliced from the count cube.
+
+    The defaults, or no microdata store, give :data:`CROSSTABS`.
+    """
+    years = tuple(years) if years else YEARS
+    if not microdata.available() or (years == YEARS and not bands):
+        return CROSSTABS
+    return _sliced(years, tuple(bands))
+
+
+def close_friends(years=None, bands=()):
+    """:data:`CLOSE_FRIENDS` for the same slice as :func:`crosstabs`."""
+    engine = crosstabs(years, bands)
+    if engine is CROSSTABS:
+        return CLOSE_FRIENDS
+    return _close_friends(engine)
+
+
+def respondents(engine, name):
+    """How many respondents of the slice in *engine* answered item *name*."""
+    return int(engine.view(name).sum())
+
+
+def shares(engine, name, category):
+    """``(male %, female %)`` giving *category* to item *name*, the row percentages the charts show."""
+    row = engine.frame(name, "row_pct").loc[category]
+    return tuple(float(row[sex]) for sex in engine.sexes)
+
+
+@functools.lru_cache(maxsize=32)
+def _sliced(years, bands):
+    return CrosstabEngine(cube.load().tables(years, bands, CATEGORIES))
+
+
+@functools.lru_cache(maxsize=32)
+def _close_friends(engine):
+    return WeightedSample.from_crosstab(engine, "friends_count")
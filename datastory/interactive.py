@@ -0,0 +1,177 @@
+"""Client-side (plotly) versions of the story's time series and grouped bar charts.
+
+With interactive charts switched on in the sidebar, each chart is sent to
+the browser once as a plotly spec (numeric arrays are base64-encoded
+float32), and everything the reader does with it happens client-side:
+zooming into a range of years with the range slider, switching a bar chart
+between counts and percentages with its buttons, and hiding a gender by
+clicking it in the legend. None of these trigger a rerun. With them
+switched off the story keeps using the cached PNGs from
+:mod:`datastory.charts`.
+
+Figures are built once per data hash and shared by every session, like
+the PNGs.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from datastory import charts, perf
+
+MODE_KEY = "interactive_charts"
+MAX_FIGURES = 64
+# matplotlib's first two default colours, so both modes look alike
+SEX_COLORS = {"MALE": "#1f77b4", "FEMALE": "#ff7f0e"}
+
+_figures = OrderedDict()
+_lock = threading.Lock()
+
+
+def enabled():
+    import streamlit as st
+
+    return bool(st.session_state.get(MODE_KEY, False))
+
+
+def _cached(kind, data, build, **style):
+    key = charts.chart_key(kind, data, "plotly", style)
+    with perf.span(f"plotly: {style.get('title', kind)}", "chart"):
+        with _lock:
+            figure = _figures.get(key)
+            if figure is not None:
+                _figures.move_to_end(key)
+        perf.cache_status("memory" if figure is not None else "miss")
+        if figure is None:
+            figure = build(data, **style)
+            with _lock:
+                _figures[key] = figure
+                while len(_figures) > MAX_FIGURES:
+                    _figures.popitem(last=False)
+    return figure
+
+
+def _compact(values, decimals=None):
+    values = np.asarray(values, dtype=np.float32)
+    return values.round(decimals) if decimals is not None else values
+
+
+def line_figure(df, x, y, label, title, xlabel, ylabel):
+    """Line with markers and a range slider for zooming into years."""
+    import plotly.graph_objects as go
+
+    figure = go.Figure(go.Scatter(
+        x=np.asarray(df[x]), y=_compact(df[y]), name=label, mode="lines+markers", line={"color": "blue"},
+    ))
+    figure.update_layout(
+        title=title, xaxis_title=xlabel, yaxis_title=ylabel, showlegend=True,
+        xaxis={"rangeslider": {"visible": True}, "dtick": 1 if len(df) <= 20 else None},
+    )
+    return figure
+
+
+def multi_line_figure(df, title, xlabel, ylabel, legend_title=None):
+    """One line per column of *df* against its index, with the same range slider as :func:`line_figure`."""
+    import plotly.graph_objects as go
+
+    x = np.asarray(df.index)
+    figure = go.Figure([
+        go.Scatter(x=x, y=_compact(df[column]), name=str(column), mode="lines+markers") for column in df.columns
+    ])
+    if df.shape[1] > 10:
+        # like the PNG, 20 colours before they repeat instead of 10
+        import plotly.colors
+
+        figure.update_layout(colorway=plotly.colors.qualitative.Light24)
+    figure.update_layout(
+        title=title, xaxis_title=xlabel, yaxis_title=ylabel, legend_title=legend_title, showlegend=True,
+        xaxis={"rangeslider": {"visible": True}, "dtick": 1 if len(df) <= 20 else None},
+    )
+    return figure
+
+
+def bar_figure(counts, percentages, title, xlabel, show):
+    """Grouped bars per gender with buttons switching between counts and percentages."""
+    import plotly.graph_objects as go
+
+    figure = go.Figure()
+    kinds = {"counts": (counts, "Count", None), "percentages": (percentages, "Percentage", 1)}
+    for kind, (df, _, decimals) in kinds.items():
+        for sex in df.columns:
+            figure.add_trace(go.Bar(
+                x=list(df.index), y=_compact(df[sex], decimals), name=sex,
+                legendgroup=sex, showlegend=kind == show, visible=kind == show,
+                marker_color=SEX_COLORS.get(sex),
+            ))
+    width = counts.shape[1]
+    buttons = [
+        {
+            "label": kind.capitalize(),
+            "method": "update",
+            "args": [
+                {"visible": [k == kind for k in kinds for _ in range(width)],
+                 "showlegend": [k == kind for k in kinds for _ in range(width)]},
+                {"yaxis.title.text": ylabel},
+            ],
+        }
+        for kind, (_, ylabel, _) in kinds.items()
+    ]
+    figure.update_layout(
+        title=title, xaxis_title=xlabel, yaxis_title=kinds[show][1], barmode="group", legend_title="Gender",
+        updatemenus=[{
+            "type": "buttons", "direction": "right", "buttons": buttons, "active": list(kinds).index(show),
+            "x": 1, "xanchor": "right", "y": 1.15, "yanchor": "bottom",
+        }],
+    )
+    return figure
+
+
+def show_line_chart(df, x, y, label, title, xlabel, ylabel, **style):
+    """A time series, as a plotly chart when interactive charts are on and a cached PNG otherwise."""
+    import streamlit as st
+
+    if not enabled():
+        st.image(charts.line_chart(df, x, y, label, title, xlabel, ylabel, **style))
+        return
+    st.plotly_chart(_cached(
+        "line", df[[x, y]], lambda data, **kw: line_figure(data, **kw),
+        x=x, y=y, label=label, title=title, xlabel=xlabel, ylabel=ylabel,
+    ))
+
+
+def show_multi_line_chart(df, title, xlabel, ylabel, legend_title=None):
+    """One line per column of *df*, as a plotly chart when interactive charts are on and a cached PNG otherwise."""
+    import streamlit as st
+
+    if not enabled():
+        st.image(charts.multi_line_chart(df, title, xlabel, ylabel, legend_title=legend_title))
+        return
+    st.plotly_chart(_cached(
+        "lines", df, lambda data, **kw: multi_line_figure(data, **kw),
+        title=title, xlabel=xlabel, ylabel=ylabel, legend_title=legend_title,
+    ))
+
+
+def show_bar_chart(counts, title, xlabel, percentages=None, show="counts", figsize=(10, 6)):
+    """A (category x gender) bar chart of *counts* or *percentages*.
+
+    *percentages* default to each gender's share of its own column. The
+    PNG fallback shows whichever of the two *show* names.
+    """
+    import streamlit as st
+
+    if not counts.to_numpy().any():
+        # e.g. a range of survey years in which the question was not asked
+        st.info(f"{title}: no respondents in the selected years and age groups.")
+        return
+    if percentages is None:
+        percentages = counts / counts.sum() * 100
+    if not enabled():
+        df, ylabel = (counts, "Count") if show == "counts" else (percentages, "Percentage")
+        st.image(charts.bar_chart(df, title, xlabel=xlabel, ylabel=ylabel, figsize=figsize))
+        return
+    st.plotly_chart(_cached(
+        "bars", counts.join(percentages, rsuffix=" %"),
+        lambda data, **kw: bar_figure(counts, percentages, **kw),
+        title=title, xlabel=xlabel, show=show,
+    ))
@@ -0,0 +1,238 @@
+"""Parse-once loading for the story's CSV sources.
+
+Each source is parsed at most once per process and the result is shared by
+every session, so the frames handed out here must be treated as read-only.
+A cheap ``os.stat`` check runs on every call; the file is only re-hashed when
+its size or mtime moves, and only re-parsed when its content hash changes.
+
+Parsed frames are stored compactly (category for text columns, float32 and
+int32 for numbers) and written to an Arrow IPC sidecar under ``.cache/``
+named after the content hash, so a cold process memory-maps the sidecar
+instead of parsing the CSV text again. Numeric columns read from a sidecar
+stay backed by the mapped file, so every session, and every server process
+on the machine, reads the same pages.
+
+The World Happiness and Gallup data are time series assembled from yearly
+releases, see datastory/releases.py; they are loaded by series name
+(``load("happiness")``) the same way.
+"""
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from datastory import perf
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # sidecars are an optimization, the CSVs still work
+    pa = None
+
+ROOT = Path(__file__).resolve().parent.parent
+# where the CSVs are read from; the benchmarks point this at synthetic data
+DATA_DIR = Path(os.environ.get("DATASTORY_DATA_DIR", ROOT))
+CACHE_DIR = Path(os.environ.get("DATASTORY_CACHE_DIR", ROOT / ".cache"))
+# bump when compact() changes so old sidecars are not reused
+SIDECAR_FORMAT = 2
+
+
+def compact(df):
+    """*df* with text columns as categories and numbers as float32 / int32."""
+    columns = {}
+    for name, column in df.items():
+        if pd.api.types.is_float_dtype(column.dtype):
+            columns[name] = column.astype("float32")
+        elif pd.api.types.is_integer_dtype(column.dtype) and column.abs().max() < 2**31:
+            columns[name] = column.astype("int32")
+        elif pd.api.types.is_string_dtype(column.dtype) or column.dtype == object:
+            columns[name] = column.astype("category")
+    return df.assign(**columns) if columns else df
+
+
+def _read_tabulation(path):
+    from datastory.tabulation import read_tabulation
+
+    return read_tabulation(path)
+
+
+@dataclass(frozen=True)
+class Source:
+    filename: str
+    read_options: dict = field(default_factory=dict)
+    clean: object = None
+    # parser to use instead of pd.read_csv, called with the path
+    read: object = None
+    # bump when read/clean change so old sidecars are not reused
+    version: int = 1
+
+    @property
+    def path(self):
+        return DATA_DIR / self.filename
+
+
+SOURCES = {
+    "gss_tabulation": Source("tabulation.csv", read=_read_tabulation),
+}
+
+_lock = threading.RLock()
+# name -> (stat key, content hash, frame)
+_frames = {}
+# (name, input hashes) -> derived value
+_derived = {}
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def content_hash(path):
+    """Return a short BLAKE2 digest of the file at *path*."""
+    digest = hashlib.blake2b(digest_size=12)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sidecar_path(name, digest):
+    return CACHE_DIR / f"{name}-{SIDECAR_FORMAT}.{SOURCES[name].version}-{digest}.arrow"
+
+
+def read_arrow(path):
+    """The frame in the Arrow IPC file at *path*, memory-mapped, or None if it is missing or unreadable."""
+    if pa is None or not path.exists():
+        return None
+    try:
+        # the table (and the map) stay alive for as long as the frame's columns refer to them
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        return table.to_pandas(split_blocks=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def write_arrow(path, df):
+    """Write *df* to *path* as uncompressed Arrow IPC, atomically; False if it could not be written."""
+    if pa is None:
+        return False
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except OSError:
+        return False
+    return True
+
+
+def _write_sidecar(name, digest, df):
+    path = _sidecar_path(name, digest)
+    if write_arrow(path, df):
+        # drop sidecars left behind by older versions of the same file
+        for stale in CACHE_DIR.glob(f"{name}-*.arrow"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+
+
+def _parse(name, source, digest):
+    df = read_arrow(_sidecar_path(name, digest))
+    perf.cache_status("sidecar" if df is not None else "miss")
+    if df is None:
+        if source.read is not None:
+            df = source.read(source.path)
+        else:
+            df = pd.read_csv(source.path, **source.read_options)
+        if source.clean is not None:
+            df = source.clean(df)
+        df = compact(df)
+        _write_sidecar(name, digest, df)
+    return df
+
+
+def fingerprint(name):
+    """Return the content hash of source or series *name*, re-hashing only if it was touched."""
+    return _load(name)[1]
+
+
+def load(name):
+    """Return the parsed frame for source or series *name* (shared, do not mutate)."""
+    return _load(name)[2]
+
+
+def _load(name):
+    with perf.span(f"load: {name}", "data"):
+        if name in SOURCES:
+            return _load_entry(name)
+        # the happiness and Gallup time series, consolidated from their yearly releases
+        from datastory import releases
+
+        return releases.load_entry(name)
+
+
+def _load_entry(name):
+    source = SOURCES[name]
+    key = _stat_key(source.path)
+    entry = _frames.get(name)
+    if entry is not None and entry[0] == key:
+        perf.cache_status("memory")
+        return entry
+    with _lock:
+        entry = _frames.get(name)
+        if entry is not None and entry[0] == key:
+            perf.cache_status("memory")
+            return entry
+        digest = content_hash(source.path)
+        if entry is not None and entry[1] == digest:
+            # touched but unchanged, keep the parsed frame
+            perf.cache_status("memory")
+            entry = (key, digest, entry[2])
+        else:
+            entry = (key, digest, _parse(name, source, digest))
+        _frames[name] = entry
+        return entry
+
+
+def clear():
+    """Forget every parsed and derived value in this process (the sidecars stay on disk)."""
+    from datastory import releases
+
+    with _lock:
+        _frames.clear()
+        _derived.clear()
+    releases.clear()
+
+
+def derived(name, inputs, build):
+    """Memoize ``build()`` on the content hashes of the *inputs* sources."""
+    key = (name, tuple(fingerprint(i) for i in inputs))
+    with perf.span(f"derived: {name}", "data"):
+        return _derived_value(name, key, build)
+
+
+def _derived_value(name, key, build):
+    value = _derived.get(key)
+    perf.cache_status("memory" if value is not None else "miss")
+    if value is None:
+        with _lock:
+            value = _derived.get(key)
+            if value is None:
+                value = build()
+                # only the latest version of each derived value is kept
+                for old in [k for k in _derived if k[0] == name]:
+                    del _derived[old]
+                _derived[key] = value
+    return value
+
+
+def gss_tabulation():
+    """Tidy (variable, sex, category, value) form of the GSS tabulation.csv export."""
+    return load("gss_tabulation")
+
+
+def satisfaction():
+    """Gallup 'very satisfied with personal life' by year."""
+    return load("satisfaction")
@@ -0,0 +1,313 @@
+"""Chunked ingestion of GSS microdata into a year-partitioned Parquet store.
+
+    python -m datastory.microdata ingest GSS7224_R1.dta      # or a .csv/.csv.gz extract
+    python -m datastory.microdata crosstab friends --years 2010 2022
+
+The cumulative GSS file has thousands of variables and runs to hundreds of
+megabytes, so it is streamed ``chunksize`` rows at a time and only the
+columns the story uses are kept (plus age, for subgroup filters). Response
+labels are stored as int8 codes (numeric items such as the number of close
+friends keep their value as int16), with ``-1`` for inapplicable, don't know
+and no answer, and written as one Parquet file per chunk and year under
+``year=YYYY/``. The labels for the codes are kept in ``_schema.json`` next to
+the data (the leading underscore keeps Parquet readers from treating it as
+data).
+
+Crosstabs are computed from the store with the year range and the
+non-missing filters pushed down to the Parquet scan, so only the matching
+partitions and row groups are read.
+
+The GSS mnemonics of the social-network module items changed between
+releases; check ``ITEMS`` against the codebook of the file being ingested.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from datastory.loading import DATA_DIR, content_hash
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = Path(os.environ.get("DATASTORY_GSS_STORE", DATA_DIR / "gss_store"))
+SCHEMA_VERSION = 2
+YEAR = "year"
+SEX = "sex"
+SEX_COLUMN = "SEX (respondents sex)"
+MISSING = {
+    "", "IAP", "INAPPLICABLE", "DK", "DON'T KNOW", "DONT KNOW", "NA", "NO ANSWER",
+    "SKIPPED ON WEB", "NOT AVAILABLE IN THIS YEAR", "NOT AVAILABLE IN THIS RELEASE", "REFUSED",
+}
+
+
+@dataclass(frozen=True)
+class Item:
+    column: str
+    # store the number itself instead of a label code
+    numeric: bool = False
+
+
+# story crosstab name -> GSS variable
+ITEMS = {
+    "friends": Item("socfrend"),
+    "bar": Item("socbar"),
+    "neighbors": Item("socommun"),
+    "bf_call": Item("bfcall"),
+    "interaction": Item("bfvisit"),
+    "needy_frd": Item("needyfrd"),
+    "friends_count": Item("numfrend", numeric=True),
+    "romance": Item("partnered"),
+}
+# respondent attributes kept for filtering, not charted themselves
+SUBGROUPS = {
+    "age": Item("age", numeric=True),
+}
+# labels in the microdata for categories the story names differently
+ALIASES = {
+    "friends_count": {"0": "No other close friends"},
+}
+
+
+def _normalize(values):
+    """Upper-case string labels, with the GSS missing-value codes as NaN."""
+    labels = values.astype("string").str.strip().str.upper()
+    return labels.mask(labels.isin(MISSING) | labels.str.startswith(".", na=False))
+
+
+def _columns(path):
+    """Column names of the CSV or Stata file at *path*, without reading the data."""
+    if path.suffix.lower() == ".dta":
+        with pd.read_stata(path, iterator=True) as reader:
+            return list(reader.variable_labels())
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _chunks(path, columns, chunksize):
+    if path.suffix.lower() == ".dta":
+        with pd.read_stata(path, columns=columns, chunksize=chunksize, convert_categoricals=True) as reader:
+            yield from reader
+    else:
+        with pd.read_csv(path, usecols=columns, chunksize=chunksize, dtype=str, keep_default_na=False) as reader:
+            yield from reader
+
+
+class _Vocabulary:
+    """Label -> int8 code for one column, grown as new labels show up."""
+
+    def __init__(self):
+        self.labels = []
+        self._codes = {}
+
+    def encode(self, labels):
+        for label in labels.dropna().unique():
+            if label not in self._codes:
+                if len(self.labels) == 127:
+                    raise ValueError(f"more than 127 distinct labels, starting with {self.labels[:5]}")
+                self._codes[label] = len(self.labels)
+                self.labels.append(label)
+        return labels.map(self._codes).fillna(-1).astype(np.int8).to_numpy()
+
+
+def ingest(source, store=STORE_DIR, chunksize=100_000):
+    """Stream *source* into a Parquet store at *store*; skipped if the store already holds this file."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source, store = Path(source), Path(store)
+    digest = content_hash(source)
+    try:
+        schema = json.loads((store / "_schema.json").read_text())
+        if schema["version"] == SCHEMA_VERSION and schema["source"]["hash"] == digest:
+            return store
+    except (OSError, ValueError, KeyError):
+        pass
+
+    by_name = {c.lower(): c for c in _columns(source)}
+    for required in (YEAR, SEX):
+        if required not in by_name:
+            raise ValueError(f"{source} has no {required.upper()} column")
+    items = {name: item for name, item in ITEMS.items() if item.column in by_name}
+    for name in ITEMS.keys() - items.keys():
+        logger.warning("%s has no %s column, the %s crosstab will be empty", source, ITEMS[name].column, name)
+    subgroups = {name: item for name, item in SUBGROUPS.items() if item.column in by_name}
+    wanted = [by_name[YEAR], by_name[SEX]] + [by_name[item.column] for item in items.values()]
+    wanted += [by_name[item.column] for item in subgroups.values()]
+
+    # write next to the old store and swap at the end, so readers never see half a store
+    building = store.with_name(store.name + f".tmp{os.getpid()}")
+    shutil.rmtree(building, ignore_errors=True)
+    vocabularies = {SEX: _Vocabulary()}
+    vocabularies.update({item.column: _Vocabulary() for item in items.values() if not item.numeric})
+    rows, years = 0, set()
+    for i, chunk in enumerate(_chunks(source, wanted, chunksize)):
+        chunk.columns = [c.lower() for c in chunk.columns]
+        year = pd.to_numeric(chunk[YEAR], errors="coerce")
+        keep = year.notna().to_numpy()
+        columns = {SEX: vocabularies[SEX].encode(_normalize(chunk[SEX]))[keep]}
+        for item in [*items.values(), *subgroups.values()]:
+            values = _normalize(chunk[item.column])
+            if item.numeric:
+                # top codes such as "89 OR OLDER" keep their number
+                numbers = pd.to_numeric(values.str.extract(r"^(\d+)", expand=False), errors="coerce")
+                columns[item.column] = numbers.fillna(-1).astype(np.int16).to_numpy()[keep]
+            else:
+                columns[item.column] = vocabularies[item.column].encode(values)[keep]
+        year = year.to_numpy()[keep].astype(np.int16)
+        for y in np.unique(year):
+            selected = year == y
+            table = pa.table({name: values[selected] for name, values in columns.items()})
+            partition = building / f"{YEAR}={y}"
+            partition.mkdir(parents=True, exist_ok=True)
+            pq.write_table(table, partition / f"part-{i:05d}.parquet")
+            years.add(int(y))
+        rows += int(keep.sum())
+        logger.info("ingested %d rows from %s", rows, source.name)
+
+    schema = {
+        "version": SCHEMA_VERSION,
+        "source": {"name": source.name, "hash": digest},
+        "rows": rows,
+        "years": sorted(years),
+        "sexes": vocabularies[SEX].labels,
+        "items": {
+            name: {"column": item.column, "numeric": item.numeric,
+                   "labels": None if item.numeric else vocabularies[item.column].labels}
+            for name, item in items.items()
+        },
+        "subgroups": {name: item.column for name, item in subgroups.items()},
+    }
+    building.mkdir(parents=True, exist_ok=True)
+    (building / "_schema.json").write_text(json.dumps(schema, indent=1))
+    old = store.with_name(store.name + f".old{os.getpid()}")
+    if store.exists():
+        store.rename(old)
+    building.rename(store)
+    shutil.rmtree(old, ignore_errors=True)
+    _stores.pop(store, None)
+    return store
+
+
+class Store:
+    """Read side of an ingested store: crosstabs by sex with the filters pushed down to Parquet."""
+
+    def __init__(self, path=STORE_DIR):
+        import pyarrow.dataset as ds
+
+        self.path = Path(path)
+        self.schema = json.loads((self.path / "_schema.json").read_text())
+        self.dataset = ds.dataset(self.path, format="parquet", partitioning="hive")
+
+    def sex_lookup(self, sexes):
+        """Store sex code -> position in *sexes*, -1 for sexes not asked for."""
+        lookup = np.full(len(self.schema["sexes"]), -1)
+        for i, sex in enumerate(sexes):
+            if sex in self.schema["sexes"]:
+                lookup[self.schema["sexes"].index(sex)] = i
+        return lookup
+
+    def counts(self, name, years=None, sexes=("MALE", "FEMALE")):
+        """``(label x sex)`` counts of respondents for item *name* in the inclusive *years* range."""
+        import pyarrow.dataset as ds
+
+        item = self.schema["items"].get(name)
+        if item is None:
+            return pd.DataFrame(columns=list(sexes), dtype=np.int64)
+        column = item["column"]
+        lookup = self.sex_lookup(sexes)
+        condition = (ds.field(column) >= 0) & ds.field(SEX).isin(np.flatnonzero(lookup >= 0).tolist())
+        if years is not None:
+            condition &= (ds.field(YEAR) >= years[0]) & (ds.field(YEAR) <= years[1])
+        table = self.dataset.to_table(columns=[SEX, column], filter=condition)
+        sex = lookup[table[SEX].to_numpy()]
+        codes = table[column].to_numpy().astype(np.int64)
+        width = int(codes.max()) + 1 if len(codes) else 0
+        if not item["numeric"]:
+            width = len(item["labels"])
+        grid = np.bincount(sex * width + codes, minlength=len(sexes) * width).reshape(len(sexes), width)
+        labels = [str(v) for v in range(width)] if item["numeric"] else item["labels"]
+        frame = pd.DataFrame(grid.T, index=labels, columns=list(sexes))
+        return frame[frame.sum(axis=1) > 0] if item["numeric"] else frame
+
+    def crosstab(self, name, years=None, categories=None):
+        """Item *name* in the GSS export shape the story's crosstabs use (see datastory/gss.py).
+
+        *categories* gives the display labels in order; labels in the store
+        match them case-insensitively (or via ``ALIASES``), and labels not
+        listed are appended after them.
+        """
+        return export_table(self.counts(name, years), name, categories)
+
+    def tables(self, years=None, categories=None):
+        """Every item in :data:`ITEMS` as an export-shaped crosstab, for :class:`CrosstabEngine`."""
+        categories = categories or {}
+        return {name: self.crosstab(name, years, categories.get(name)) for name in ITEMS}
+
+
+def export_table(counts, name, categories=None):
+    """A ``(label x sex)`` count frame for item *name* in the GSS export shape (see datastory/gss.py).
+
+    *categories* gives the display labels in order; labels in the store
+    match them case-insensitively (or via ``ALIASES``), and labels not
+    listed are appended after them.
+    """
+    aliases = {k.upper(): v for k, v in ALIASES.get(name, {}).items()}
+    display = {c.upper(): c for c in categories or []}
+    counts = counts.copy()
+    counts.index = [aliases.get(label, display.get(label, label)) for label in counts.index]
+    counts = counts.groupby(level=0, sort=False).sum()
+    order = list(categories or []) + [label for label in counts.index if label not in (categories or [])]
+    counts = counts.reindex(order, fill_value=0)
+    table = {SEX_COLUMN: list(counts.columns) + ["Total"]}
+    for label, row in counts.iterrows():
+        table[label] = [int(v) for v in row] + [int(row.sum())]
+    totals = counts.sum()
+    table["Total"] = [int(v) for v in totals] + [int(totals.sum())]
+    return table
+
+
+_stores = {}
+
+
+def available(path=STORE_DIR):
+    return (Path(path) / "_schema.json").exists()
+
+
+def store(path=STORE_DIR):
+    """The :class:`Store` at *path*, opened once per process."""
+    path = Path(path)
+    if path not in _stores:
+        _stores[path] = Store(path)
+    return _stores[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="stream a GSS .csv or .dta file into the store")
+    ingest_parser.add_argument("source", type=Path)
+    ingest_parser.add_argument("--store", type=Path, default=STORE_DIR)
+    ingest_parser.add_argument("--chunksize", type=int, default=100_000)
+    crosstab_parser = commands.add_parser("crosstab", help="print one crosstab from the store")
+    crosstab_parser.add_argument("name", choices=ITEMS)
+    crosstab_parser.add_argument("--store", type=Path, default=STORE_DIR)
+    crosstab_parser.add_argument("--years", type=int, nargs=2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "ingest":
+        path = ingest(args.source, args.store, args.chunksize)
+        print(f"wrote {path}", file=sys.stderr)
+    else:
+        table = Store(args.store).crosstab(args.name, args.years)
+        print(pd.DataFrame(table).set_index(SEX_COLUMN).T.to_string())
+
+
+if __name__ == "__main__":
+    main()
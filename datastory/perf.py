@@ -0,0 +1,210 @@
+"""Timings for each script run and fragment rerun of the story, plus opt-in profiling.
+
+Every run records its wall time, the CPU time of the session's script
+thread and the time until the section's first content was sent. The numbers
+are logged and the last few runs are kept in ``st.session_state`` so they
+can be shown in the sidebar.
+
+Profiling is enabled per session with ``?profile=1`` in the URL (or for
+every session with ``DATASTORY_PROFILE=1``). While it is on, :func:`span`
+records the elapsed time, net Python allocations and cache status of each
+section, data load and chart render, emits each one as a JSON log line and
+lists them in a debug panel at the bottom of the page. While it is off,
+:func:`span` returns a shared no-op context manager, so the hooks can stay
+in place.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+HISTORY_KEY = "perf_history"
+HISTORY_LENGTH = 20
+
+_local = threading.local()
+_NOOP = nullcontext()
+# sessions currently profiling; tracemalloc runs while there is at least one
+_tracing = 0
+_tracing_lock = threading.Lock()
+
+
+class Run:
+    def __init__(self, name, profile=False):
+        self.name = name
+        self.first_content_ms = None
+        self.spans = [] if profile else None
+        self._open = []
+        self._wall = time.perf_counter()
+        # each session's script runs on its own thread, so this is that session's CPU
+        self._cpu = time.thread_time()
+
+    def wall_ms(self):
+        return (time.perf_counter() - self._wall) * 1000
+
+    def cpu_ms(self):
+        return (time.thread_time() - self._cpu) * 1000
+
+    def as_dict(self):
+        return {
+            "run": self.name,
+            "first content (ms)": self.first_content_ms,
+            "wall (ms)": round(self.wall_ms(), 1),
+            "cpu (ms)": round(self.cpu_ms(), 1),
+        }
+
+
+def current():
+    return getattr(_local, "run", None)
+
+
+def profiling_requested():
+    if os.environ.get("DATASTORY_PROFILE") == "1":
+        return True
+    import streamlit as st
+
+    try:
+        return st.query_params.get("profile") == "1"
+    except Exception:  # not running inside a Streamlit session
+        return False
+
+
+def _start_tracing():
+    global _tracing
+    with _tracing_lock:
+        if _tracing == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing += 1
+
+
+def _stop_tracing():
+    global _tracing
+    with _tracing_lock:
+        _tracing -= 1
+        if _tracing == 0:
+            tracemalloc.stop()
+
+
+@contextmanager
+def measure(name, profile=None, allocations=True):
+    """Time a script run or fragment rerun as *name*, profiling it if the session asked for it."""
+    if profile is None:
+        profile = profiling_requested()
+    tracing = profile and allocations
+    run = Run(name, profile)
+    outer = current()
+    _local.run = run
+    if tracing:
+        _start_tracing()
+    try:
+        yield run
+    finally:
+        _local.run = outer
+        if tracing:
+            _stop_tracing()
+        record = run.as_dict()
+        logger.info("%s: first content %s ms, wall %s ms, cpu %s ms", name,
+                    record["first content (ms)"], record["wall (ms)"], record["cpu (ms)"])
+        _remember(record)
+
+
+def _remember(record):
+    import streamlit as st
+
+    try:
+        history = st.session_state.setdefault(HISTORY_KEY, [])
+    except Exception:  # not running inside a Streamlit session
+        return
+    history.append(record)
+    del history[:-HISTORY_LENGTH]
+
+
+def span(name, kind):
+    """Profile a section, data load or chart render; a shared no-op unless profiling."""
+    run = current()
+    if run is None or run.spans is None:
+        return _NOOP
+    return _span(run, name, kind)
+
+
+@contextmanager
+def _span(run, name, kind):
+    record = {"name": name, "kind": kind, "cache": None}
+    run._open.append(record)
+    allocated = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        record["net alloc (KB)"] = round((tracemalloc.get_traced_memory()[0] - allocated) / 1024, 1)
+        run._open.pop()
+        run.spans.append(record)
+        logger.info(json.dumps(dict(record, event="span", run=run.name)))
+
+
+def cache_status(status):
+    """Note whether the innermost open span was served from a cache (e.g. "memory", "disk", "miss")."""
+    run = current()
+    if run is not None and run.spans is not None and run._open:
+        run._open[-1]["cache"] = status
+
+
+def first_content():
+    """Mark that the current run has sent its first visible content."""
+    run = current()
+    if run is not None and run.first_content_ms is None:
+        run.first_content_ms = round(run.wall_ms(), 1)
+
+
+def fragment(func):
+    """``st.fragment`` that also times each rerun of *func*."""
+    import streamlit as st
+
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        if current() is not None:
+            # part of a full run, which is already being timed
+            with span(func.__name__, "fragment"):
+                return func(*args, **kwargs)
+        with measure(f"{func.__name__} (fragment)") as run:
+            result = func(*args, **kwargs)
+            if run.spans is not None:
+                _panel(run)
+            return result
+
+    return st.fragment(timed)
+
+
+def _panel(run):
+    import streamlit as st
+
+    from datastory import charts
+
+    with st.expander(f"Profiling: {run.name}"):
+        st.caption(f"{run.wall_ms():.0f} ms wall, {run.cpu_ms():.0f} ms CPU")
+        if run.spans:
+            st.dataframe(run.spans, hide_index=True)
+        st.caption("Chart cache: " + ", ".join(f"{k} {v}" for k, v in charts.cache.stats().items()))
+
+
+def report():
+    """Sidebar summary of the current run and recent runs, and the profiling panel if enabled."""
+    import streamlit as st
+
+    run = current()
+    if run is not None and run.spans is not None:
+        _panel(run)
+    with st.sidebar.expander("Performance"):
+        if run is not None:
+            st.caption(
+                f"This run: first content after {run.first_content_ms} ms, "
+                f"{run.wall_ms():.0f} ms wall, {run.cpu_ms():.0f} ms CPU"
+            )
+        history = st.session_state.get(HISTORY_KEY)
+        if history:
+            st.dataframe(list(reversed(history)), hide_index=True)
@@ -0,0 +1,307 @@
+"""Yearly World Happiness and Gallup releases, consolidated into one time series per dataset.
+
+    python -m datastory.releases          # each series' releases, schemas and years
+
+A new release is added by dropping its CSV into ``releases/<series>/``
+(e.g. ``releases/happiness/2025happiness.csv``), next to the files the
+story ships with; nothing in the story needs editing.
+
+``SCHEMAS`` is the registry of release formats. Each one says which columns
+identify a file as that format, how its columns map to the series' canonical
+names, whether the year comes from a column or from the file name (the
+single-year World Happiness reports have no year column), and which of its
+columns are on the series' own scale.
+
+Every release is parsed once, normalized to the canonical columns and
+written under ``.cache/series/<series>/`` as an Arrow part named after its
+content hash, and the parts are consolidated into one memory-mapped
+columnar file per series. A manifest keeps each release's size, mtime and
+hash, so a call only stats the files: a new or changed release is parsed
+and appended on its own, a touched or renamed one is recognized by its hash
+and a removed one is dropped. Where two releases cover the same row, the
+higher-ranked schema wins, then the release that reaches the later year.
+
+A series' fingerprint is taken over its parts, and it is what
+:func:`datastory.loading.fingerprint` returns for the series, so the values
+derived from one series (and the exported sections that use it) are only
+rebuilt when that series gets a release.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from datastory import perf
+from datastory.loading import CACHE_DIR, DATA_DIR, compact, content_hash, read_arrow, write_arrow
+
+logger = logging.getLogger(__name__)
+
+RELEASES_DIR = DATA_DIR / "releases"
+SERIES_DIR = CACHE_DIR / "series"
+# bump when the part or consolidated layout changes so old files are not reused
+FORMAT = 1
+
+
+@dataclass(frozen=True)
+class Series:
+    # columns identifying a row, the year last
+    key: tuple
+    columns: tuple
+    # the releases shipped with the story, relative to DATA_DIR
+    files: tuple = ()
+
+    @property
+    def year(self):
+        return self.key[-1]
+
+
+@dataclass(frozen=True)
+class Schema:
+    series: str
+    # raw columns a release must have to be read with this schema
+    signature: tuple
+    rename: dict = field(default_factory=dict)
+    read_options: dict = field(default_factory=dict)
+    clean: object = None
+    # no year column, the year is the one in the file name
+    year_in_name: bool = False
+    # canonical columns on the series' own scale, None for all of them
+    comparable: tuple = None
+    # wins over lower ranks where releases cover the same rows
+    rank: int = 0
+    # bump when the mapping changes so old parts are not reused
+    version: int = 1
+
+
+def _clean_gallup(df):
+    # the first column is the full question text
+    df.columns = ["Year", "Very Satisfied (%)"]
+    # the dataset was weirdly formatted, so the year column needs cleaning
+    df["Year"] = df["Year"].astype(int)
+    return df
+
+
+SERIES = {
+    "happiness": Series(
+        ("Country name", "year"),
+        ("Ladder score", "Social support", "Log GDP per capita", "Healthy life expectancy",
+         "Freedom to make life choices", "Generosity", "Perceptions of corruption",
+         "Positive affect", "Negative affect"),
+        files=("2005happiness.csv", "2024happiness.csv"),
+    ),
+    "satisfaction": Series(("Year",), ("Very Satisfied (%)",), files=("Personal_Life_Satisfaction.csv",)),
+}
+
+# tried in order, the first whose signature a release has is used
+SCHEMAS = {
+    # every country and year since 2005, with the survey measures themselves
+    "world_happiness_panel": Schema(
+        "happiness", ("Country name", "year", "Life Ladder"),
+        rename={"Life Ladder": "Ladder score", "Healthy life expectancy at birth": "Healthy life expectancy"},
+        read_options={"encoding": "ISO-8859-1"}, rank=1,
+    ),
+    # one year's report; apart from the ladder score its columns are each factor's contribution to the score
+    "world_happiness_report": Schema(
+        "happiness", ("Country name", "Ladder score"),
+        read_options={"encoding": "ISO-8859-1"}, year_in_name=True, comparable=("Ladder score",),
+    ),
+    # Gallup's "very satisfied with your personal life" trend
+    "gallup_very_satisfied": Schema("satisfaction", ("% Very satisfied",), clean=_clean_gallup),
+}
+
+_lock = threading.Lock()
+# series -> (stat key of its release files, fingerprint, frame)
+_series = {}
+
+
+def release_files(name):
+    """The releases of series *name*: the ones shipped with the story, then the drop-ins."""
+    shipped = [DATA_DIR / filename for filename in SERIES[name].files]
+    return shipped + sorted((RELEASES_DIR / name).glob("*.csv"))
+
+
+def detect(path, name):
+    """Name of the first schema of series *name* that *path* matches, or None."""
+    # latin-1 reads any header; the signatures are plain ASCII
+    columns = set(pd.read_csv(path, nrows=0, encoding="ISO-8859-1").columns)
+    for schema_name, schema in SCHEMAS.items():
+        if schema.series == name and columns.issuperset(schema.signature):
+            return schema_name
+    return None
+
+
+def read_release(path, schema_name):
+    """The release at *path* with the canonical columns of its series (NaN for the ones it lacks)."""
+    schema = SCHEMAS[schema_name]
+    series = SERIES[schema.series]
+    df = pd.read_csv(path, **schema.read_options)
+    if schema.clean is not None:
+        df = schema.clean(df)
+    df = df.rename(columns=schema.rename)
+    if schema.year_in_name:
+        match = re.search(r"(?:19|20)\d\d", path.name)
+        if match is None:
+            raise ValueError(f"{path.name} has no year column and no year in its name")
+        df[series.year] = int(match.group())
+    df = df.reindex(columns=[*series.key, *series.columns]).dropna(subset=list(series.key))
+    return compact(df.assign(schema=schema_name).reset_index(drop=True))
+
+
+def comparable(df):
+    """The consolidated *df* with the values that are not on the series' own scale set to NaN."""
+    masks = {}
+    for schema_name, schema in SCHEMAS.items():
+        if schema.comparable is None:
+            continue
+        rows = (df["schema"] == schema_name).to_numpy()
+        for column in SERIES[schema.series].columns:
+            if column in df and column not in schema.comparable:
+                masks[column] = masks.get(column, False) | rows
+    return df.assign(**{column: df[column].mask(mask) for column, mask in masks.items()})
+
+
+def _stat(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_manifest(directory):
+    try:
+        manifest = json.loads((directory / "manifest.json").read_text())
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("releases", {}) if manifest.get("format") == FORMAT else {}
+
+
+def _write_manifest(directory, releases):
+    path = directory / "manifest.json"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps({"format": FORMAT, "releases": releases}, indent=1, sort_keys=True))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _ingest(path, name, digest, directory):
+    """Parse one new release, write its part and return its manifest entry (None if no schema fits)."""
+    schema_name = detect(path, name)
+    if schema_name is None:
+        logger.warning("%s matches none of the %s schemas, skipping it", path.name, name)
+        return None
+    with perf.span(f"release: {path.name}", "data"):
+        df = read_release(path, schema_name)
+    part = f"{schema_name}-{FORMAT}.{SCHEMAS[schema_name].version}-{digest}.arrow"
+    write_arrow(directory / part, df)
+    years = df[SERIES[name].year]
+    logger.info("appended %s to %s: %d rows, %s-%s", path.name, name, len(df), years.min(), years.max())
+    return {"hash": digest, "schema": schema_name, "part": part, "rows": len(df),
+            "years": [int(years.min()), int(years.max())] if len(df) else None}
+
+
+def _fingerprint(releases):
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr(FORMAT).encode())
+    for release in sorted(releases, key=lambda r: r["hash"]):
+        digest.update(repr((release["hash"], release["schema"], SCHEMAS[release["schema"]].version)).encode())
+    return digest.hexdigest()
+
+
+def _consolidate(name, releases, directory):
+    series = SERIES[name]
+    # lowest precedence first, so the rows kept for a key come from the best release
+    order = sorted(releases.items(), key=lambda item: (
+        SCHEMAS[item[1]["schema"]].rank, (item[1]["years"] or [0, 0])[1], item[0]))
+    parts = []
+    for relative, release in order:
+        part = read_arrow(directory / release["part"])
+        parts.append(part if part is not None else read_release(DATA_DIR / relative, release["schema"]))
+    if not parts:
+        return pd.DataFrame(columns=[*series.key, *series.columns, "schema"])
+    df = pd.concat(parts, ignore_index=True).drop_duplicates(list(series.key), keep="last")
+    return compact(df.sort_values(list(series.key)).reset_index(drop=True))
+
+
+def _refresh(name, files):
+    """Append the new releases of series *name* and return its ``(fingerprint, frame)``."""
+    directory = SERIES_DIR / name
+    known = _read_manifest(directory)
+    by_hash = {r["hash"]: r for r in known.values() if (directory / r["part"]).exists()}
+    releases, appended = {}, False
+    for path in files:
+        relative = os.path.relpath(path, DATA_DIR)
+        stat = _stat(path)
+        old = known.get(relative)
+        if old is not None and old["stat"] == stat and old["hash"] in by_hash:
+            releases[relative] = old
+            continue
+        digest = content_hash(path)
+        if digest in by_hash:
+            # touched, renamed or copied, but already ingested
+            releases[relative] = dict(by_hash[digest], stat=stat)
+            continue
+        release = _ingest(path, name, digest, directory)
+        if release is not None:
+            releases[relative] = by_hash[digest] = dict(release, stat=stat)
+            appended = True
+
+    fingerprint = _fingerprint(releases.values())
+    consolidated = directory / f"{name}-{fingerprint}.arrow"
+    frame = read_arrow(consolidated)
+    perf.cache_status("sidecar" if frame is not None else "miss")
+    if frame is None:
+        frame = _consolidate(name, releases, directory)
+        write_arrow(consolidated, frame)
+    if appended or releases != known:
+        _write_manifest(directory, releases)
+        # drop the parts and consolidated files of releases that are gone
+        keep = {r["part"] for r in releases.values()} | {consolidated.name}
+        for path in directory.glob("*.arrow"):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+    return fingerprint, frame
+
+
+def load_entry(name):
+    """``(stat key, fingerprint, frame)`` for series *name*, appending any new releases first."""
+    files = [p for p in release_files(name) if p.exists()]
+    key = tuple((str(p), *_stat(p)) for p in files)
+    entry = _series.get(name)
+    if entry is not None and entry[0] == key:
+        perf.cache_status("memory")
+        return entry
+    with _lock:
+        entry = _series.get(name)
+        if entry is None or entry[0] != key:
+            entry = (key, *_refresh(name, files))
+            _series[name] = entry
+        else:
+            perf.cache_status("memory")
+        return entry
+
+
+def clear():
+    """Forget the consolidated series in this process (the parts stay on disk)."""
+    with _lock:
+        _series.clear()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for name in SERIES:
+        _, fingerprint, frame = load_entry(name)
+        print(f"{name}: {len(frame)} rows, fingerprint {fingerprint}")
+        for relative, release in sorted(_read_manifest(SERIES_DIR / name).items()):
+            years = "-".join(map(str, release["years"] or ["none"]))
+            print(f"    {relative:<45} {release['schema']:<26} {years:<10} {release['rows']:6d} rows")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
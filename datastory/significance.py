@@ -0,0 +1,179 @@
+"""Significance tests and confidence intervals for every gender crosstab at once.
+
+Works on the stacked ``(variable, sex, category)`` arrays of a
+:class:`~datastory.crosstab.CrosstabEngine`, so each statistic is one array
+operation over all variables:
+
+* a chi-square test of independence between sex and response per variable
+  (with Cramér's V, and a flag when expected counts are too small for the
+  test to be reliable),
+* the male minus female difference in the share giving each response, with
+  a normal-approximation confidence interval,
+* a bootstrap interval for the same differences, from resampling every
+  crosstab's respondents ``resamples`` times in a single multinomial draw.
+
+Percentages here are shares of the counts in each row, not of the export's
+``Total`` column. Results are cached on a hash of the counts and settings, so
+only the first call in a process does any work.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+# the distribution functions themselves; scipy.stats takes about a second to import
+from scipy import special
+
+from datastory import perf
+
+MAX_CACHED = 8
+# the usual rule of thumb for the chi-square approximation
+MIN_EXPECTED = 5
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+class CrosstabStats:
+    """Chi-square tests and difference-in-proportion intervals for a :class:`CrosstabEngine`.
+
+    Per-variable arrays have shape ``(variable,)`` and per-category arrays
+    ``(variable, category)``, aligned with the engine's padded categories.
+    Differences are male minus female, in percentage points.
+    """
+
+    def __init__(self, engine, confidence=0.95, resamples=2000, seed=0):
+        if len(engine.sexes) != 2:
+            raise ValueError(f"expected two sexes, got {engine.sexes}")
+        self.names = engine.names
+        self.sexes = engine.sexes
+        self.categories = engine.categories
+        self.confidence = confidence
+        self.resamples = resamples
+
+        counts = np.asarray(engine.counts, dtype=np.float64)
+        n = counts.sum(axis=2)
+        category_totals = counts.sum(axis=1)
+        total = n.sum(axis=1)
+        valid = category_totals > 0
+
+        # chi-square test of independence, skipping empty and padded categories
+        expected = n[:, :, None] * category_totals[:, None, :] / np.where(total > 0, total, 1)[:, None, None]
+        cells = valid[:, None, :] & (expected > 0)
+        self.chi2 = np.where(cells, (counts - expected) ** 2 / np.where(cells, expected, 1), 0).sum(axis=(1, 2))
+        k = valid.sum(axis=1)
+        self.dof = (len(self.sexes) - 1) * (k - 1)
+        self.p_value = special.chdtrc(np.maximum(self.dof, 1), self.chi2)
+        self.cramers_v = np.sqrt(self.chi2 / np.where(total > 0, total, 1) / np.maximum(np.minimum(1, k - 1), 1))
+        self.sparse = ((expected < MIN_EXPECTED) & cells).sum(axis=(1, 2)) > 0.2 * cells.sum(axis=(1, 2))
+
+        # difference in proportions with a normal-approximation interval
+        share = np.divide(counts, n[:, :, None], out=np.zeros_like(counts), where=n[:, :, None] > 0)
+        self.share = share * 100
+        self.diff = (share[:, 0] - share[:, 1]) * 100
+        variance = np.divide(
+            share * (1 - share), n[:, :, None], out=np.zeros_like(share), where=n[:, :, None] > 0
+        ).sum(axis=1)
+        z = special.ndtri(0.5 + confidence / 2)
+        margin = z * np.sqrt(variance) * 100
+        self.diff_low = self.diff - margin
+        self.diff_high = self.diff + margin
+
+        # bootstrap: every resample of every crosstab in one multinomial draw
+        rng = np.random.default_rng(seed)
+        draws = rng.multinomial(n.astype(np.int64), share, size=(resamples,) + n.shape)
+        resampled = draws / np.where(n > 0, n, 1)[None, :, :, None]
+        boot_diff = (resampled[:, :, 0] - resampled[:, :, 1]) * 100
+        alpha = (1 - confidence) / 2 * 100
+        self.boot_low, self.boot_high = np.percentile(boot_diff, [alpha, 100 - alpha], axis=0)
+
+        self.significant = valid & ((self.diff_low > 0) | (self.diff_high < 0))
+        for array in (self.chi2, self.dof, self.p_value, self.cramers_v, self.sparse, self.share, self.diff,
+                      self.diff_low, self.diff_high, self.boot_low, self.boot_high, self.significant):
+            array.setflags(write=False)
+
+    def frame(self, name):
+        """Per-category shares, difference and intervals for one crosstab."""
+        v = self.names.index(name)
+        width = len(self.categories[name])
+        level = f"{self.confidence:.0%}"
+        male, female = (s.capitalize() for s in self.sexes)
+        return pd.DataFrame({
+            f"{male} (%)": self.share[v, 0, :width],
+            f"{female} (%)": self.share[v, 1, :width],
+            "Difference (pp)": self.diff[v, :width],
+            f"{level} CI low": self.diff_low[v, :width],
+            f"{level} CI high": self.diff_high[v, :width],
+            "Bootstrap low": self.boot_low[v, :width],
+            "Bootstrap high": self.boot_high[v, :width],
+            "Significant": self.significant[v, :width],
+        }, index=self.categories[name])
+
+    def summary(self, name):
+        """One-line annotation for a chart: the chi-square test and the largest significant gap."""
+        v = self.names.index(name)
+        if self.dof[v] < 1:
+            return "Too few responses for a chi-square test."
+        p = self.p_value[v]
+        text = f"Chi-square test: χ²({self.dof[v]}) = {self.chi2[v]:.1f}, " + (
+            "p < 0.001" if p < 0.001 else f"p = {p:.3f}"
+        )
+        text += f", Cramér's V = {self.cramers_v[v]:.2f}"
+        text += " (significant at 5%)." if p < 0.05 else " (not significant at 5%)."
+        if self.sparse[v]:
+            text += " Many expected counts are below 5, so the test is approximate."
+        width = len(self.categories[name])
+        gaps = np.where(self.significant[v, :width], np.abs(self.diff[v, :width]), -1)
+        if gaps.max() >= 0:
+            c = int(gaps.argmax())
+            category = self.categories[name][c]
+            more, gap, low, high = self.gap(name, category)
+            sign = 1 if more == self.sexes[0] else -1
+            boot_low, boot_high = sorted((sign * self.boot_low[v, c], sign * self.boot_high[v, c]))
+            text += (
+                f" Largest significant gap: {category!r}, {more.lower()} respondents "
+                f"+{gap:.1f} pp ({self.confidence:.0%} CI {low:.1f} to {high:.1f}; "
+                f"bootstrap {boot_low:.1f} to {boot_high:.1f})."
+            )
+        return text
+
+    def gap(self, name, category):
+        """``(sex, gap, low, high)``: the sex more likely to give *category*, by how many pp, and the interval."""
+        v = self.names.index(name)
+        c = self.categories[name].index(category)
+        # express the gap as "more" for whichever sex leads, intervals included
+        sign = 1 if self.diff[v, c] > 0 else -1
+        low, high = sorted((sign * self.diff_low[v, c], sign * self.diff_high[v, c]))
+        return self.sexes[0 if sign > 0 else 1], float(sign * self.diff[v, c]), float(low), float(high)
+
+    def differs(self, name, category):
+        """Whether the chi-square test for *name* is significant and *category*'s interval excludes zero."""
+        v = self.names.index(name)
+        c = self.categories[name].index(category)
+        return bool(self.p_value[v] < 1 - self.confidence and self.significant[v, c])
+
+
+def _key(engine, confidence, resamples, seed):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(engine.counts).tobytes())
+    digest.update(repr((engine.counts.shape, engine.names, engine.sexes, engine.categories)).encode())
+    digest.update(repr((confidence, resamples, seed)).encode())
+    return digest.hexdigest()
+
+
+def analyze(engine, confidence=0.95, resamples=2000, seed=0):
+    """:class:`CrosstabStats` for *engine*, computed once per distinct input."""
+    key = _key(engine, confidence, resamples, seed)
+    with perf.span("stats: crosstabs", "compute"):
+        with _lock:
+            result = _cache.get(key)
+            perf.cache_status("memory" if result is not None else "miss")
+            if result is None:
+                result = CrosstabStats(engine, confidence, resamples, seed)
+                _cache[key] = result
+                while len(_cache) > MAX_CACHED:
+                    _cache.popitem(last=False)
+            else:
+                _cache.move_to_end(key)
+    return result
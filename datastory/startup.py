@@ -0,0 +1,153 @@
+"""Cold starts: warm the caches a new instance reads, preload before serving, and time the imports.
+
+    python -m datastory.startup warm          # at image build time
+    python -m datastory.startup serve -- --server.port 8501
+    python -m datastory.startup imports       # import time of the first page and each section, by package
+
+``warm`` builds matplotlib's font cache, draws one figure so the style
+and font files are read once, and then renders every section of the story
+headlessly (as the static export does), which writes the data sidecars, the
+GSS count cube, the image variants and every chart PNG to ``.cache``. Run it
+as the user the server runs as (or with the same ``MPLCONFIGDIR``), or
+matplotlib rebuilds its font cache on first use.
+
+``serve`` is ``streamlit run MLE_Story.py`` that first imports ``PRELOAD``,
+what the entry point and the first section import, and loads the shared
+country index, so the health check only passes once the first page is cheap. With a
+warm ``.cache`` the first page then never imports matplotlib at all, see
+:func:`datastory.charts.figure`.
+
+``imports`` runs a fresh interpreter per section with ``-X importtime`` and
+sums each module's own import time by top-level package.
+"""
+import argparse
+import ast
+import importlib
+import subprocess
+import sys
+import tempfile
+
+from datastory import perf
+from datastory.loading import ROOT
+from datastory.story import SECTIONS
+
+ENTRY = "MLE_Story.py"
+# what MLE_Story.py and the first section import; keep in step with them (``imports`` times exactly these)
+PRELOAD = (
+    "streamlit", "datastory.assets", "datastory.countries", "datastory.interactive",
+    "datastory.microdata", "datastory.perf", "datastory.story",
+)
+
+
+def preload_statements():
+    return [f"import {module}" for module in PRELOAD]
+
+
+def import_statements(script):
+    """The module-level ``import`` statements of *script* (a path relative to the repo), as source."""
+    tree = ast.parse((ROOT / script).read_text())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def preload():
+    """Import what the first page imports and load the shared data, before any session arrives."""
+    with perf.span("startup: preload", "data"):
+        for module in PRELOAD:
+            importlib.import_module(module)
+        from datastory import countries
+
+        countries.index()
+
+
+def warm():
+    """Fill the caches a new instance would otherwise build on its first requests."""
+    from datastory import charts, export
+
+    # the first import builds the font list; drawing text loads the default font and style
+    fig = charts.figure()
+    fig.subplots().set_title("warm")
+    fig.canvas.draw()
+    charts.release(fig)
+    with tempfile.TemporaryDirectory() as out_dir:
+        export.export(out_dir, force=True)
+    import matplotlib
+
+    return matplotlib.get_cachedir()
+
+
+def _importtime(statements):
+    """``-X importtime`` of *statements* in a fresh interpreter, as ``[(module, self seconds, group)]``.
+
+    Each group of statements is timed separately, in order, so a later group
+    only pays for the modules the earlier ones did not import.
+    """
+    code = []
+    for i, group in enumerate(statements):
+        code.append(f"import sys; sys.stderr.write('group {i}\\n')")
+        code += group
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(code)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules, group = [], None
+    for line in result.stderr.splitlines():
+        if line.startswith("group "):
+            group = int(line.split()[1])
+        elif line.startswith("import time:") and group is not None:
+            own, _, name = line[len("import time:"):].split("|")
+            if own.strip().isdigit():
+                modules.append((name.strip(), int(own) / 1e6, group))
+    return modules
+
+
+def by_package(modules):
+    """Total own import seconds per top-level package, largest first."""
+    totals = {}
+    for name, seconds, _ in modules:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + seconds
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def import_report(top=8):
+    """Rows of ``(what, total seconds, [(package, seconds)])``: the first page, then each other section."""
+    first = preload_statements()
+    modules = _importtime([first])
+    rows = [(f"{ENTRY} + {SECTIONS[0][0]}", sum(s for _, s, _ in modules), by_package(modules)[:top])]
+    for script, _, _ in SECTIONS[1:]:
+        extra = [m for m in _importtime([first, import_statements(script)]) if m[2] == 1]
+        rows.append((f"then {script}", sum(s for _, s, _ in extra), by_package(extra)[:top]))
+    return rows
+
+
+def serve(streamlit_args):
+    preload()
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", str(ROOT / ENTRY), *streamlit_args]
+    return cli.main()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("warm", help="build the font, data and chart caches")
+    serve_parser = commands.add_parser("serve", help="preload, then streamlit run the story")
+    serve_parser.add_argument("streamlit_args", nargs=argparse.REMAINDER, help="passed on to streamlit run")
+    imports_parser = commands.add_parser("imports", help="import time of each section, by package")
+    imports_parser.add_argument("--top", type=int, default=8, help="packages listed per section")
+    args = parser.parse_args()
+
+    if args.command == "warm":
+        print(f"warmed .cache and the matplotlib cache in {warm()}", file=sys.stderr)
+    elif args.command == "serve":
+        return serve([a for a in args.streamlit_args if a != "--"])
+    else:
+        for what, total, packages in import_report(args.top):
+            print(f"{what:<40} {total * 1000:7.0f} ms")
+            for package, seconds in packages:
+                print(f"    {package:<36} {seconds * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""The story's sections, in reading order, shared by the app, the export and the benchmarks."""
+
+PAGE_TITLE = "Are men really more lonely?"
+
+# (script, title, url path)
+SECTIONS = [
+    ("sections/happiness.py", "Happiness Trends", "happiness"),
+    ("sections/us_compare.py", "How the U.S. Compares", "us-compare"),
+    ("sections/satisfaction.py", "Life Satisfaction", "satisfaction"),
+    ("sections/socializing.py", "Socializing", "socializing"),
+    ("sections/best_friends.py", "Best Friends", "best-friends"),
+    ("sections/close_friends.py", "Close Friends", "close-friends"),
+    ("sections/romance.py", "Romantic Partners", "romantic-partners"),
+]
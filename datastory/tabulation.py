@@ -0,0 +1,150 @@
+"""Streaming parser for GSS Data Explorer crosstab exports (``tabulation.csv``).
+
+The export is laid out sideways: the row variable (SEX) and its categories
+come first, one per line, then each column variable (SOCBAR, SOCOMMUN,
+SOCFREND, ...) as a label line followed by a line of categories where each
+category spans all columns up to the next one. The data lines come last, one
+per row category, with percentage strings such as ``68%``.
+
+The file is read one line at a time and each line is parsed in one vectorized
+pass. Header lines are kept as integer codes per column and data lines as
+float32 arrays of their non-empty cells, so memory grows with the number of
+filled cells rather than with the raw text, and only one line of text is held
+at a time.
+"""
+import csv
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+VARIABLE = re.compile(r"^([A-Z][A-Z0-9_]*) \((.*)\)$")
+PATH_SEP = " | "
+
+
+def _cells(row):
+    return pd.Series(row, dtype=object).str.strip()
+
+
+class _Level:
+    """One column variable's category line, stored as a code per column."""
+
+    def __init__(self, row, total_columns):
+        cells = _cells(row)
+        if total_columns:
+            cells.iloc[[j for j in total_columns if j < len(cells)]] = "Total"
+        filled = (cells != "").to_numpy()
+        # each category spans the empty cells after it, like a merged header cell
+        owner = np.maximum.accumulate(np.where(filled, np.arange(len(cells)), 0))
+        self.codes, self.categories = pd.factorize(cells.to_numpy()[owner])
+
+    def codes_for(self, columns):
+        # rows shorter than the header inherit the last category
+        return self.codes[np.minimum(columns, len(self.codes) - 1)]
+
+
+class TabulationParser:
+    """Incremental parser: feed it lines, then call :meth:`frame`."""
+
+    def __init__(self):
+        self.row_variable = None
+        self.row_labels = []
+        self.variables = []
+        self._levels = []
+        self._total_columns = set()
+        self._expect_categories = False
+        # one (row code, columns, values) chunk per data line
+        self._chunks = []
+
+    def feed(self, row):
+        first = row[0].strip() if row else ""
+        if not first and not any(c.strip() for c in row):
+            return
+        match = VARIABLE.match(first)
+        if self.row_variable is None:
+            if match is None:
+                raise ValueError(f"expected a variable label such as 'SEX (respondents sex)', got {first!r}")
+            self.row_variable = match.group(1)
+        elif match is not None:
+            self.variables.append(match.group(1))
+            self._total_columns.update(j for j, c in enumerate(row) if j and c.strip() == "Total")
+            self._expect_categories = True
+        elif not self.variables:
+            self.row_labels.append(first)
+        elif self._expect_categories:
+            self._levels.append(_Level(row, self._total_columns))
+            self._expect_categories = False
+        else:
+            self._feed_data(row)
+
+    def _feed_data(self, row):
+        code = len(self._chunks)
+        if code >= len(self.row_labels):
+            raise ValueError(f"more data rows than {self.row_variable} categories ({self.row_labels})")
+        text = _cells(row).str.rstrip("%").str.replace(",", "", regex=False)
+        values = pd.to_numeric(text.where(text != "")).to_numpy(dtype=np.float32)
+        # empty cells are padding, only keep the filled ones
+        columns = np.flatnonzero(~np.isnan(values)).astype(np.uint32)
+        self._chunks.append((code, columns, values[columns]))
+
+    def _column_paths(self, columns):
+        """Category path per column, e.g. ``'NEVER | ONCE A YEAR | NEVER'``."""
+        keys = np.zeros(len(columns), dtype=np.int64)
+        for level in self._levels:
+            keys = keys * len(level.categories) + level.codes_for(columns)
+        is_total = np.isin(columns, list(self._total_columns))
+        keys[is_total] = -1
+        # keep the export's column order for the categories
+        path_index, unique = pd.factorize(keys)
+        first = columns[np.unique(path_index, return_index=True)[1]]
+        parts = [np.asarray(level.categories, dtype=object)[level.codes_for(first)] for level in self._levels]
+        categories = [
+            "Total" if key == -1 else PATH_SEP.join(path)
+            for key, path in zip(unique, zip(*parts))
+        ]
+        return path_index, categories
+
+    def frame(self, drop_empty=True):
+        """Long-format table with one row per (row category, column cell)."""
+        if not self._chunks:
+            raise ValueError("no data rows found")
+        row_codes = np.concatenate([np.full(len(c), code, dtype=np.int16) for code, c, _ in self._chunks])
+        col_codes = np.concatenate([c for _, c, _ in self._chunks])
+        values = np.concatenate([v for _, _, v in self._chunks])
+
+        if drop_empty and "Total" in self.row_labels:
+            # a zero in the Total row means nobody answered that combination
+            total = self.row_labels.index("Total")
+            empty = col_codes[(row_codes == total) & (values == 0)]
+            keep = ~np.isin(col_codes, empty)
+            row_codes, col_codes, values = row_codes[keep], col_codes[keep], values[keep]
+
+        columns, col_index = np.unique(col_codes, return_inverse=True)
+        path_index, categories = self._column_paths(columns)
+        return pd.DataFrame({
+            "variable": pd.Categorical.from_codes(
+                np.zeros(len(values), dtype=np.int8), [" x ".join(self.variables)]
+            ),
+            self.row_variable.lower(): pd.Categorical.from_codes(row_codes, self.row_labels),
+            "category": pd.Categorical.from_codes(path_index[col_index].astype(np.int32), categories),
+            "value": values,
+        })
+
+
+def read_tabulation(path, drop_empty=True):
+    """Parse a GSS crosstab export into a tidy (variable, sex, category, value) frame."""
+    parser = TabulationParser()
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            parser.feed(row)
+    return parser.frame(drop_empty=drop_empty)
+
+
+if __name__ == "__main__":
+    # python -m datastory.tabulation tabulation.csv [out.parquet]
+    tidy = read_tabulation(sys.argv[1])
+    if len(sys.argv) > 2:
+        tidy.to_parquet(sys.argv[2], index=False)
+    else:
+        print(tidy.to_string(max_rows=40))
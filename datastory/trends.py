@@ -0,0 +1,140 @@
+"""Trend statistics for every country and every World Happiness metric at once.
+
+Every happiness release is harmonized once (see
+:func:`datastory.countries.harmonize`) and stacked into a single
+``(metric, country, year)`` array with NaN for the years a country was not
+surveyed. Every statistic is then a masked reduction over the year axis, so
+all countries and metrics are fitted together instead of one at a time:
+
+* the least-squares slope per year, from the masked sums of the normal
+  equations,
+* the change since ``BASE_YEAR`` (latest value minus the base-year value),
+* the rank in the base year and in the latest year, and the movement
+  between the two (rank 1 is the best, which for corruption and negative
+  affect is the lowest),
+* volatility, the standard deviation of the residuals around the fitted
+  line.
+
+Only the ladder score is on the survey's own scale in the single-year
+reports (see ``comparable`` in datastory/releases.py), so the other metrics
+end with the yearly panel.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from datastory import countries, loading, perf
+
+BASE_YEAR = 2012
+# fewer surveyed years than this and a country gets no slope or volatility
+MIN_YEARS = 3
+LOWER_IS_BETTER = {"Perceptions of corruption", "Negative affect"}
+
+
+class Trends:
+    """Slopes, changes, ranks and volatility for every (metric, country) of a :class:`CountryIndex`."""
+
+    def __init__(self, index, metrics=countries.ALL_METRICS, base_year=BASE_YEAR):
+        self.metrics = list(metrics)
+        self.countries = index.countries
+        self.years = index.years
+        self.base_year = base_year
+        values = np.stack([index.matrices[m] for m in self.metrics]).astype(np.float64)
+        observed = ~np.isnan(values)
+        y = np.where(observed, values, 0)
+
+        # least squares for every series at once, on years centred for stability
+        t = self.years - self.years.mean()
+        n = observed.sum(axis=2)
+        st, stt = observed @ t, observed @ (t * t)
+        sy, sty = y.sum(axis=2), y @ t
+        denom = n * stt - st ** 2
+        fitted = (n >= MIN_YEARS) & (denom > 0)
+        safe_denom, safe_n = np.where(fitted, denom, 1), np.where(n > 0, n, 1)
+        self.slope = np.where(fitted, (n * sty - st * sy) / safe_denom, np.nan)
+        intercept = (sy - np.nan_to_num(self.slope) * st) / safe_n
+        residuals = np.where(observed, values - intercept[..., None] - np.nan_to_num(self.slope)[..., None] * t, 0)
+        self.volatility = np.where(
+            fitted, np.sqrt((residuals ** 2).sum(axis=2) / np.where(fitted, n - 2, 1)), np.nan
+        )
+        self.observed_years = n
+
+        # latest value per series, and each metric's latest year with any data
+        last = observed.shape[2] - 1 - observed[..., ::-1].argmax(axis=2)
+        self.latest = np.where(n > 0, np.take_along_axis(values, last[..., None], axis=2)[..., 0], np.nan)
+        self.latest_year = self.years[observed.any(axis=1).cumsum(axis=1).argmax(axis=1)]
+        base = np.searchsorted(self.years, base_year)
+        in_range = base < len(self.years) and self.years[base] == base_year
+        self.base = values[:, :, base] if in_range else np.full(values.shape[:2], np.nan)
+        self.change = self.latest - self.base
+
+        latest_values = values[np.arange(len(self.metrics)), :, np.searchsorted(self.years, self.latest_year)]
+        self.base_rank = self._ranks(self.base)
+        self.latest_rank = self._ranks(latest_values)
+        self.rank_change = self.base_rank - self.latest_rank
+        for array in (self.slope, self.volatility, self.latest, self.base, self.change,
+                      self.base_rank, self.latest_rank, self.rank_change):
+            array.setflags(write=False)
+
+    def _ranks(self, values):
+        """Rank of every country within each metric (1 is the best), NaN where there is no value."""
+        lower = np.array([m in LOWER_IS_BETTER for m in self.metrics])[:, None]
+        key = np.where(np.isnan(values), np.inf, np.where(lower, values, -values))
+        order = key.argsort(axis=1, kind="stable")
+        ranks = np.empty_like(values)
+        np.put_along_axis(ranks, order, np.arange(1, values.shape[1] + 1, dtype=np.float64)[None, :], axis=1)
+        return np.where(np.isnan(values), np.nan, ranks)
+
+    def frame(self, metric):
+        """Leaderboard for one metric: a row per country with data, best latest rank first."""
+        m = self.metrics.index(metric)
+        latest_year = int(self.latest_year[m])
+        df = pd.DataFrame({
+            f"Rank {latest_year}": self.latest_rank[m],
+            f"Rank {self.base_year}": self.base_rank[m],
+            "Rank change": self.rank_change[m],
+            f"Latest ({latest_year})": self.latest[m],
+            "Slope per year": self.slope[m],
+            f"Change since {self.base_year}": self.change[m],
+            "Volatility": self.volatility[m],
+            "Years surveyed": self.observed_years[m],
+        }, index=pd.Index(self.countries, name="Country"))
+        df = df[df["Years surveyed"] > 0]
+        return df.sort_values([f"Rank {latest_year}", "Country"], na_position="last")
+
+    def compare(self, country):
+        """One country across every metric, next to the median country."""
+        c = self.countries.index(country)
+        with np.errstate(invalid="ignore"), warnings.catch_warnings(), perf.span("trends: compare", "compute"):
+            # a metric nobody has values for gets a NaN median
+            warnings.simplefilter("ignore", RuntimeWarning)
+            slopes = self.slope
+            # like the ranks, a falling slope is the better one where lower is better
+            lower = np.array([m in LOWER_IS_BETTER for m in self.metrics])[:, None]
+            improving = np.where(lower, -slopes, slopes)
+            fitted = np.maximum((~np.isnan(slopes)).sum(axis=1), 1)
+            share_worse = (improving < improving[:, c : c + 1]).sum(axis=1) / fitted
+            return pd.DataFrame({
+                "Latest year": self.latest_year,
+                country: self.latest[:, c],
+                "Median country": np.nanmedian(self.latest, axis=1),
+                "Rank": self.latest_rank[:, c],
+                "Countries ranked": (~np.isnan(self.latest_rank)).sum(axis=1),
+                f"Change since {self.base_year}": self.change[:, c],
+                f"Median change since {self.base_year}": np.nanmedian(self.change, axis=1),
+                "Slope per year": slopes[:, c],
+                "Trend better than % of countries": np.where(np.isnan(slopes[:, c]), np.nan, share_worse * 100),
+            }, index=pd.Index(self.metrics, name="Metric"))
+
+
+def _build():
+    index = countries.CountryIndex(
+        countries.harmonize(countries.ALL_METRICS, comparable=True), metrics=countries.ALL_METRICS
+    )
+    return Trends(index)
+
+
+def analyze():
+    """The shared :class:`Trends`, rebuilt only when a happiness release is added or changed."""
+    return loading.derived("trends", ("happiness",), _build)
@@ -0,0 +1,63 @@
+import streamlit as st
+
+from datastory import cube, gss, interactive, perf, significance
+
+# the years and age groups picked in the sidebar
+CROSSTABS = gss.crosstabs(*cube.selection())
+
+st.title("Do Men and Women Spend Equal Amounts of Quality Time With Their Friends?")
+perf.first_content()
+if CROSSTABS is not gss.CROSSTABS:
+    st.caption(gss.SLICE_NOTE)
+
+st.write("""Next, I'll look at the frequency of which men and women call and visit their best friends. I think effort put into friendships through quality time and interaction is an important factor of the quality of socializtion, because if people are in contact with a close friend, they may not be as lonely as someone who is not. It also can say something about the support men and women give to their prospective friends, and the level of support they get back. This ties in to the idea of loneliness because it measures the amount of communication and contact through phone calls and visits.""")
+
+# Calling Best Friend Section
+st.header("How Often Do People Call Their Best Friend?")
+
+interactive.show_bar_chart(
+    CROSSTABS.frame("bf_call"), "Frequency of Calling Best Friend by Gender (Percentage)",
+    xlabel="Frequency of Calling", percentages=CROSSTABS.frame("bf_call", "row_pct"), show="percentages",
+)
+st.caption(significance.analyze(CROSSTABS).summary("bf_call"))
+
+
+st.write(""" This shows that women are more likely to call their best friend daily. Men and women are nearly identical in "several times a week" and "once a week" categories, and men are slightly more likely to call "several times a year" or "less often".""")
+
+st.header("How Often Do People Visit Their Best Friend?")
+
+# Plot
+interactive.show_bar_chart(
+    CROSSTABS.frame("interaction"), "Frequency of Visiting Best Friend by Gender",
+    xlabel="Frequency of Visiting", percentages=CROSSTABS.frame("interaction", "row_pct"),
+)
+st.caption(significance.analyze(CROSSTABS).summary("interaction"))
+
+st.write("""Men and women have similar visitation patterns with their best friends. Men are slightly more likely to visit frequently, while women are slightly more likely to visit monthly or a few times a year. This does not support the notion that men are more lonely than women if they are spending time with their friends at similar rates.""")
+
+# NEEDY FRIEND PART
+
+st.header("Contributions to a Needy Friend by Gender")
+
+# Plot
+interactive.show_bar_chart(
+    CROSSTABS.frame("needy_frd"), "Contributed to a Needy Friend by Gender",
+    xlabel="Contribution Status", percentages=CROSSTABS.frame("needy_frd", "row_pct"),
+)
+stats = significance.analyze(CROSSTABS)
+st.caption(stats.summary("needy_frd"))
+
+# the conclusion follows the test above, so it holds for whatever slice the sidebar picks
+more, gap, low, high = stats.gap("needy_frd", "YES")
+if stats.differs("needy_frd", "YES"):
+    verdict = f"The test above says this is unlikely to be chance: {more.lower()} respondents were {gap:.1f} percentage points more likely to help ({stats.confidence:.0%} CI {low:.1f} to {high:.1f}), although that is still a small difference."
+else:
+    verdict = "The test above does not find this difference significant, so I would not draw any conclusions from it."
+
+# percentages of the slice picked in the sidebar, like the chart
+helped_male, helped_female = gss.shares(CROSSTABS, "needy_frd", "YES")
+no_male, no_female = gss.shares(CROSSTABS, "needy_frd", "NO")
+if gss.respondents(CROSSTABS, "needy_frd"):
+    st.write(f"In this dataset, {helped_female:.1f}% of women reported helping a needy friend, compared with {helped_male:.1f}% of men. {no_male:.0f}% of men and {no_female:.0f}% of women said 'No' to helping a needy friend. " + verdict)
+else:
+    st.write("Nobody in the years and ages picked in the sidebar was asked about helping a needy friend.")
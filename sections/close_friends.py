@@ -0,0 +1,48 @@
+import streamlit as st
+
+from datastory import cube, gss, interactive, perf, significance
+
+# the years and age groups picked in the sidebar
+CROSSTABS = gss.crosstabs(*cube.selection())
+CLOSE_FRIENDS = gss.close_friends(*cube.selection())
+
+st.subheader("Now, I want to look at the number of close friends and see if more men report having few close friends more than women. I'll look at the number of romantic partners, too. ")
+
+# Number of Close Friends Section
+st.header("Number of Close Friends by Gender")
+perf.first_content()
+if CROSSTABS is not gss.CROSSTABS:
+    st.caption(gss.SLICE_NOTE)
+
+# Group the counts into bins ("No other close friends" counts as 0), see datastory/binning.py
+# only this chart reruns when the grouping changes
+@perf.fragment
+def close_friends_chart():
+    grouping = st.radio("Group by", ["Fixed width", "Log-spaced", "Equal-sized groups"], horizontal=True)
+    if grouping == "Fixed width":
+        width = st.slider("Bin width (number of friends)", min_value=1, max_value=25, value=10)
+        edges = CLOSE_FRIENDS.fixed_edges(width)
+        grouped_by = f"Grouped by {width}s"
+    elif grouping == "Log-spaced":
+        edges = CLOSE_FRIENDS.log_edges(st.slider("Number of bins", min_value=3, max_value=12, value=6))
+        grouped_by = "Log-spaced Groups"
+    else:
+        edges = CLOSE_FRIENDS.quantile_edges(st.slider("Number of groups", min_value=2, max_value=10, value=5))
+        grouped_by = "Groups of Roughly Equal Size"
+
+    df_grouped = CLOSE_FRIENDS.frame(edges)
+
+    # Plot 
+    interactive.show_bar_chart(
+        df_grouped, f"Number of Close Friends by Gender ({grouped_by})",
+        xlabel="Number of Close Friends (Grouped)",
+    )
+
+
+close_friends_chart()
+
+st.caption("Average and percentiles of the number of close friends, by gender")
+st.dataframe(CLOSE_FRIENDS.summary().round(1))
+st.caption(significance.analyze(CROSSTABS).summary("friends_count"))
+
+st.write(""" In this dataset, men are more likely than women to report having no close friends. Women in the dataset are slightly more likely than men to report having 10+ close friends. Men are more likely to fall into the "mid-range" (2-5 close friends). This data is interesting because it shows that men may be at a higher risk for isolation, and women may have broader support networks. The visualizations from the data I was able to gather may suggest that men do not have as many friends as women, which could be a harmful narrative to spread. """)
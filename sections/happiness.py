@@ -0,0 +1,105 @@
+import streamlit as st
+
+from datastory import assets, countries, interactive, perf
+
+st.write("""
+# Are men really more lonely? 
+## A data-driven investigation into the Male Loneliness Epidemic
+#### [Youtube Link to Overview and Walkthrough](https://youtu.be/mJwZwFGt5OU)
+
+
+In this data story, I will be investigating the [male loneliness epidemic](https://wou.edu/westernhowl/the-male-loneliness-epidemic/) and seeing if there are any truths to the so-called epidemic. My original, broad idea was to explore happiness (using the world happiness dataset), friendships, and close relationships in general, because of Gallup's finding that [life satisfaction is at an all-time low](https://news.gallup.com/poll/655493/new-low-satisfied-personal-life.aspx). 
+
+As I was doing research, I was inspired by this article about [boys and friendships](https://melindawmoyer.substack.com/p/the-epidemic-of-male-loneliness) to look at interpersonal relationships and focus on connections rather than often-cited factors like income for indicators of happiness. 
+
+In the past, I've wondered: Do men and women socialize differently? What are the differences in the different relationship styles? This [article](https://ifstudies.org/blog/male-friendships-are-not-doing-the-job) talks about the growing concern around whether boys and men confide in friends. Personally, I have had a lot of conversations with my friends about what it means to have close friendships, and I have noticed a pointed difference in the way my male friends describe their relationships to me versus how my female friends describe them to me. 
+
+I see a lot of discourse on Twitter (now X) about how this topic is sensationalized and positioned to blame women as part of a misogynistic narrative. While this may be true, I want to analyze this from a standpoint that looks at gender differences in the realms of social interactivity, including friendships and romantic relationships. 
+""") 
+
+# served from the local asset cache, see datastory/assets.py
+assets.show("twitter_discourse", caption="Twitter 'Discourse'")
+perf.first_content()
+
+# U.S. only, 2010 to the latest release, with every happiness release merged (indexed by country once per process, see datastory/countries.py)
+filter_df = countries.trend("United States", 2010)
+latest = filter_df.iloc[-1]
+# the sign of the covariance with the year is the sign of the trend line's slope
+support = filter_df.dropna(subset=["Social support"])
+support_rising = support["Social support"].cov(support["year"]) > 0
+
+st.write(f""" This data story will take you through my research process: from the initial ideas stated, to the data I was able to find (and what I did _not_ find), and the ways in which the data reshaped my research questions as I moved forward. 
+
+My initial research question(s): What are the biggest factors in recent years of this emerging "male loneliness epidemic"? Are there really pointed differences in how men and women interact interpersonally? 
+
+Starting by looking at general trends of happiness, the initial phase of data analysis shows two key findings: Happiness in the United States has been on the decline since 2005, and the decline has been characterized with record-low satisfaction in 2025, {'yet a rise in' if support_rising else 'and a decline in'} social support.
+""")
+
+## LADDER SCORE (OVERALL HAPPINESS)
+
+st.title("General Happiness Trends in the U.S. and Life Satisfaction")
+st.subheader("They've been on the decline since 2010.")
+
+st.write("""
+First, using the World Happiness Dataset [1], I want to analyze the change in the happiness ladder score over time. _The ladder score is a measure of happiness based on responses to the Cantril Ladder question that asks respondents to think of a ladder, with the best possible life for them being a 10, and the worst possible life being a 0._ I want to see if there is a notable change in happiness over time. My data gives me various scores for the years 2005 to 2024, and I will be focusing on the United States and within that, the years 2010-2024. I chose these years because I think it would provide a more up-to-date look at the data. I also want to see if there is a notable change in the years after 2012, when popular dating apps like Tinder and Hinge were released.
+""")
+
+st.markdown("<sub>[1] Islam, S. (2023, September 9). World happiness report (till 2023). Kaggle. https://www.kaggle.com/datasets/sazidthe1/global-happiness-scores-and-factors </sub>", unsafe_allow_html=True)
+
+# Display Subheader
+st.subheader(f"On average, people would rate their lives as a {latest['Ladder score']:.1f} out of 10 as of {latest['year']:.0f}.")
+
+# Plot (a cached PNG, or a client-side plotly chart with interactive charts on; see datastory/interactive.py)
+interactive.show_line_chart(
+    filter_df, "year", "Ladder score", label="Ladder Score",
+    title="Change in Ladder Score Over Time", xlabel="Year", ylabel="Ladder Score",
+)
+
+
+st.write(""" Since I want to focus on interpersonal relationships and connections, I will focus on two measures in the dataset: Social support and the ladder score.
+_The social support category points to "The national average of binary responses (either 0 or 1 representing No/Yes) to the question about having relatives or friends to count on in times of trouble._" """)
+
+## SOCIAL SUPPORT GRAPH
+
+st.subheader("Despite the decline in happiness, social support is on the rise." if support_rising else "Social support has been declining along with happiness.")
+interactive.show_line_chart(
+    filter_df, "year", "Social support", label="Social support",
+    title="Change in Social Support Over Time", xlabel="Year", ylabel="Social Support Score",
+)
+
+if support_rising:
+    st.write(""" 
+The amount of social support increasing was a good sign that people have support systems, which may indicate lower levels of loneliness. I approach this research with the assumption that companionship and connection are key to happiness and essentially the opposite of loneliness, so I was surprised to see that the ladder score was on the decline. So is life satisfaction, according to Gallup's Mood of the Nation poll that found that life satisfaction is at an all-time low.
+
+""")
+else:
+    st.write(""" 
+Fewer people saying they have relatives or friends to count on fits the assumption I approach this research with: that companionship and connection are key to happiness and essentially the opposite of loneliness. Life satisfaction is on the decline too, according to Gallup's Mood of the Nation poll that found that life satisfaction is at an all-time low.
+
+""")
+
+## COMPARING COUNTRIES
+
+st.subheader("How does the U.S. compare to other countries?")
+st.write("Pick any countries to overlay their ladder score and social support over the same years.")
+
+
+# only this part reruns when the selection changes
+@perf.fragment
+def compare_countries():
+    country_index = countries.index()
+    selected = st.multiselect("Countries", country_index.countries, default=["United States"])
+    if selected:
+        # redrawn by the browser with interactive charts on; otherwise a PNG cached per selection
+        interactive.show_multi_line_chart(
+            country_index.panel(selected, "Ladder score", 2010),
+            title="Change in Ladder Score Over Time", xlabel="Year", ylabel="Ladder Score", legend_title="Country",
+        )
+        interactive.show_multi_line_chart(
+            country_index.panel(selected, "Social support", 2010),
+            title="Change in Social Support Over Time", xlabel="Year", ylabel="Social Support Score",
+            legend_title="Country",
+        )
+
+
+compare_countries()
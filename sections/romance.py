@@ -0,0 +1,80 @@
+import streamlit as st
+
+from datastory import cube, gss, interactive, perf, significance
+
+# the years and age groups picked in the sidebar
+CROSSTABS = gss.crosstabs(*cube.selection())
+
+# Romantic Partner Section
+
+st.title("Romantic Partner Status by Gender")
+perf.first_content()
+if CROSSTABS is not gss.CROSSTABS:
+    st.caption(gss.SLICE_NOTE)
+
+# Same-gender partners are too few to show (3 respondents)
+df_romance = CROSSTABS.frame("romance").drop(index="HAS SAME GENDER PARTNER")
+
+interactive.show_bar_chart(
+    df_romance, "Romantic Partner Status by Gender", xlabel="Romantic Partner Status",
+    percentages=CROSSTABS.frame("romance", "row_pct").drop(index="HAS SAME GENDER PARTNER"),
+)
+# the test uses every category, same-gender partners included
+stats = significance.analyze(CROSSTABS)
+st.caption(stats.summary("romance"))
+
+# the conclusion follows the test above, so it holds for whatever slice the sidebar picks
+more, gap, low, high = stats.gap("romance", "YES")
+if stats.differs("romance", "YES"):
+    verdict = f"The test above says this is unlikely to be chance ({more.lower()} respondents {gap:.1f} percentage points more likely to have one, {stats.confidence:.0%} CI {low:.1f} to {high:.1f}), but a gap in who has a partner says little about how lonely either group is."
+else:
+    verdict = "The test above does not find this difference significant, so I would not draw any conclusions from it."
+
+# percentages of the slice picked in the sidebar, like the chart
+partner_male, partner_female = gss.shares(CROSSTABS, "romance", "YES")
+if gss.respondents(CROSSTABS, "romance"):
+    st.write(f"In this dataset, *{partner_male:.1f}% of men* report having a romantic partner and *{partner_female:.1f}% of women* report having one. " + verdict)
+else:
+    st.write("Nobody in the years and ages picked in the sidebar was asked about a romantic partner.")
+
+st.subheader("Quantity does not equal quality.")
+st.write("""Studies show that the sheer number of [close friends](https://libarts.source.colostate.edu/are-americans-suffering-a-friendship-crisis-study-shows-we-dont-need-more-friends-just-more-time-with-those-we-already-have/) and the presence of a [romantic partner](https://www.nathanwhudson.com/vita/pdf/Hudson%20et%20al.,%202020c.pdf) does not quite indicate the quality of ones' life and wellbeing.""")
+
+
+st.write (""" As a 20-something college student AND chronically online person, I'd continue this line of questioning and research by looking at the rise of [dating apps](https://www.pewresearch.org/internet/2020/05/08/dating-and-relationships-in-the-digital-age/) and how they've shifted the way we socialize. I want to see if I can find whether or not these apps are truly successful in helping people find connections, and whether their meteoric rise since the 2010s to now correlate at all with our general unhappiness as a society. In my personal opinion and experience with talking to friends who've tried them, it feels like they've made it easier to meet people, but harder to form meaningful connections. It's definitely a topic I'd like to explore further in other iterations of this project, by scraping data from the apps themselves and collecting more survey information. """)
+
+
+st.subheader("Questions to Explore in the Future (re. dating apps and romantic connections)")
+st.write ("""
+* What role do dating apps play in social connection, and do they correlate with lower life satisfaction?
+* Are shifts in marriage rates, friendships, and personal relationships indicators of male loneliness?
+* How do external factors like cultural expectations, economic conditions, and the pandemic contribute to male loneliness?
+""")
+
+st.title("Final Conclusions")
+st.write("""
+
+Socialization and quality of connections are complex. These findings cannot indicate causality between the habits of socialization to increased or decreased lonelineness, nor do they point to the idea that men are really _more_ lonely than women. While I was able to find some data that supported the idea that women may have broader friendship networks and more close friends, I was not able to find any data that directly supported the idea that men are more lonely than women or have lesser quality friendships. Women may be more likely to reach out to friends and help each other, and this could be due to social/cultural expectations. I think that this is a topic that is worth exploring further, and I would like to continue this project by looking at the role of dating apps in social connection and how they correlate with lower life satisfaction (if they do at all). 
+
+""")
+
+st.subheader("References")
+st.write("""
+Ansley, C. (n.d.). The Male Loneliness Epidemic. Western Oregon University. https://wou.edu/westernhowl/the-male-loneliness-epidemic/
+
+Brenan, M. (2025, January 29). New low in U.S. “very satisfied” with personal life. Gallup. https://news.gallup.com/poll/655493/new-low-satisfied-personal-life.aspx 
+
+Cox, D. (2023, March 28). Male friendships are not doing the job. Institute for Family Studies. https://ifstudies.org/blog/male-friendships-are-not-doing-the-job
+
+Davern, M., Bautista, R., Freese, J., Herd, P., & Morgan, S. L. (2024). General Social Survey, 1972-2024 [Machine-readable data file]. NORC at the University of Chicago. https://gssdataexplorer.norc.org
+
+Goddard, I. (2025, January 16). Men, women and Social Connections. Pew Research Center. https://www.pewresearch.org/social-trends/2025/01/16/men-women-and-social-connections/
+
+Hudson, N. W., Lucas, R. E., & Donnellan, M. B. (2019). The highs and lows of love: Romantic Relationship Quality Moderates whether spending time with one’s partner predicts gains or losses in well-being. Personality and Social Psychology Bulletin, 46(4), 572–589. https://doi.org/10.1177/0146167219867960 
+
+Islam, S. (2023, September 9). World happiness report (till 2023). Kaggle. https://www.kaggle.com/datasets/sazidthe1/global-happiness-scores-and-factors
+
+Moyer, M. (2023, August 8). The epidemic of male loneliness. Now What. https://melindawmoyer.substack.com/p/the-epidemic-of-male-loneliness 
+
+Nick, S. (2024, October 24). Friendship Crisis? Study Says It’s Quality, Not Quantity With Friendships. Source. https://libarts.source.colostate.edu/are-americans-suffering-a-friendship-crisis-study-shows-we-dont-need-more-friends-just-more-time-with-those-we-already-have/ 
+""")
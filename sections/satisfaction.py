@@ -0,0 +1,67 @@
+import streamlit as st
+
+from datastory import assets, interactive, loading, perf
+
+## LIFE SATISFACTION GRAPH
+
+st.subheader("Life Satisfaction is at an all-time low.")
+perf.first_content()
+
+satisfaction_data = loading.satisfaction()
+
+# plot
+interactive.show_line_chart(
+    satisfaction_data, "Year", "Very Satisfied (%)", label="Very Satisfied (%)",
+    title="Change in Personal Life Satisfaction Over the Years",
+    xlabel="Year", ylabel="Percentage of 'Very Satisfied'",
+    figsize=(10, 5), grid=True, rotate_xticks=45,
+)
+
+
+st.write(""" I'm seeing that life satisfaction is at an all-time low this year. It peaked in 2020, which is interesting considering the pandemic. I can also see that the percentage of people who are 'very satisfied' has been steadily dropping since then. However, it is worthy to keep in mind that just because people are not "very satisfied" with their lives, does not mean they are deeply unhappy. [Gallup's poll](https://news.gallup.com/poll/655493/new-low-satisfied-personal-life.aspx) revealed that another 37% of Americans today say they are “somewhat satisfied” with their personal life, while 9% are “somewhat” dissatisfied and 8% are “very” dissatisfied[2]. """)
+
+st.markdown("<sub>[2] Brenan, M. (2025, January 29). New low in U.S. “very satisfied” with personal life. Gallup. https://news.gallup.com/poll/655493/new-low-satisfied-personal-life.aspx </sub>", unsafe_allow_html=True)
+
+st.subheader("Conclusions from the data so far...")
+
+st.write(""" 
+This data was a good starting point for my research, but I wanted to see if there were any gendered differences in the data. From analyzing the World Happiness Survey and Gallup's annual Mood of the Nation poll, I can see that generally, peoples' satisfaction levels have been decreasing over the years.
+
+"In light of the emergence and popularization of the male loneliness epidemic, there has been discourse regarding its legitimacy, specifically in regards to the exclusive focus on men when it comes to discussing the general loneliness epidemic. Disparities in loneliness have been found to age, race, financial status, sexuality and disability, but, according to some critics, not for gender. The measurement of loneliness as well as the interpretation of select studies and statistics has also been cited as reasons for skepticism.[3]" """)
+
+st.markdown("<sub>[3]Ansley, C. (n.d.). The Male Loneliness Epidemic. Western Oregon University. https://wou.edu/westernhowl/the-male-loneliness-epidemic/ </sub>", unsafe_allow_html=True)
+
+st.write("""
+Is the male loneliness epidemic just something I hear about on Twitter or is it valid that there is a gendered difference...and what can be attributed to this.. I feel like it's worth exploring. 
+
+I found the General Social Survey, which is a large dataset that had survey responses from 1972 to 2024 that asked questions about socializing with friends, spending time at bars, calling best friends, and having a romantic partner. I had hoped to find data that was recent, but the website had a disclaimer that they had data up to 2022. That being said, I was able to find some data that was interesting and relevant to my research question.
+
+### Questions
+I want to try to answer this series of questions that relate to my original research question. 
+
+* Is there a measurable gender difference in reported loneliness and life satisfaction?
+* How are social factors like time with friends and the number of close friends different between men and women?
+
+
+## Pitfalls with Cleaning and Accessing Data
+The data I wanted to look at (General Social Survey Data, American Time Survey Data) did not have data in formats that were timely and publically available. I also did not find any publically available datasets about dating sites. 
+
+"What did you expect to find, what wasn’t there? How did what you DID find change your thinking about the data? How will the realities of the data be foundational to your visualization? "
+
+These are questions from the assignment that I will now answer. I expected to find really definable, gendered data that was RECENT that would lead me right to my answer. Alas, that did not really happen. Although there are reports out from centers like Pew Research and Gallup about men, women, and dating and socialization, this data was not publically available or in a format that I could wrangle, clean, and analyze. Even through searching on Kaggle which has mostly clean datasets from other people, I did not find anything recent- the best I could find was edited 10 years ago. The realities of the data show me that I need to narrow the scope of my question. I need to see how men and women socialize differently, and I will pivot to focus on friends and time spent with friends.
+
+### Pivoting...
+I will need to use reports that are available. I found a feature of the General Social Survey (GSS) that allows me to choose variables then tabulate them multivariably or cross-tabulate. In this stage, I'm just going to select by year from 2010 to 2022 and use relevant variables like socialization with friends and community for columns and sex (M/F) for the rows.
+
+Also, I've noticed that some data does not really take non-binary people into account and simply uses "sex" as Male or Female. Very binary terms, which could exclude some people. But, my question is pretty binary, and so is the whole "male loneliness" characterization that I am investigating. It's not ideal, but I will be using the binary terms for the purposes of this project. Tthe question itself, and really the whole _male loneliness_ part seems to capture people who identify as men. It does not quite capture the full picture of loneliness for people who don't identify with binary terms.
+
+### Another pitfall with data
+This process was arduous, surprisingly so. I had to get creative to get this data to be usable for the purposes of this project. In the screenshot here, you can see my cross-tabulation data was not exported correctly into excel, which I could not figure out for the life of me. """)
+
+assets.show("excel_html_cell", caption="Excel cell with html??")
+
+
+st.write("""Because of this issue, I decided I would take the data given by the cross-tabulation function and manually insert it into a dataframe so I can create visualizations. I'm picking variables like socialization with friends, number of friends, number of times they call or visit friends, etc. in the GSS survey[3] to determine socialization levels and directly compare how men and women behave within each socialization category. The reason I am choosing these variables is because I want to see if there are any gendered differences in how people socialize. These are the columns I would filter the entire dataset down to, and I would filter the rows by gender.
+""")
+
+st.markdown("<sub>[3]Davern, M., Bautista, R., Freese, J., Herd, P., & Morgan, S. L. (2024). General Social Survey, 1972-2024 [Machine-readable data file]. NORC at the University of Chicago. https://gssdataexplorer.norc.org </sub>", unsafe_allow_html=True)
@@ -0,0 +1,50 @@
+import streamlit as st
+
+from datastory import cube, gss, interactive, perf, significance
+
+# the years and age groups picked in the sidebar
+CROSSTABS = gss.crosstabs(*cube.selection())
+
+st.title("Exploring Gendered Differences in Socializing Habits")
+perf.first_content()
+if CROSSTABS is not gss.CROSSTABS:
+    st.caption(gss.SLICE_NOTE)
+
+# Socializing with Friends Section
+st.header("Socializing with Friends")
+st.markdown("""
+### How often do men and women socialize with their friends?
+Here we explore the gender differences in social interactions with friends. I used side-by-side bar charts to show 
+""")
+
+# Evenings with friends and at a bar, as percentages of each gender (the crosstabs live in datastory/gss.py),
+# annotated with a significance test (datastory/significance.py)
+def plot_graphs(name, title):
+    interactive.show_bar_chart(
+        CROSSTABS.frame(name), title, xlabel="Frequency of Activity",
+        percentages=CROSSTABS.frame(name, "row_pct"), show="percentages",
+    )
+    st.caption(significance.analyze(CROSSTABS).summary(name))
+
+st.header("Socializing with Friends")
+plot_graphs("friends", "Socializing with Friends by Gender")
+
+
+st.write("""The data shows that men are slightly more likely than women to socialize almost daily or several times a week. Women are slightly more likely to socialize several times a month or once a month. Women are more likely than men to report that they *never* socialize with friends.""")
+
+# Spending Evenings at a Bar 
+st.header("Spending Evenings at a Bar")
+st.markdown("""
+### How often do men and women spend time at bars?
+This visualization explores the differences in bar-going habits by gender.
+""")
+
+plot_graphs("bar", "Spending Evenings at a Bar by Gender")
+
+# percentages of the slice picked in the sidebar, like the chart
+never_male, never_female = gss.shares(CROSSTABS, "bar", "NEVER")
+never = f"{never_female:.1f}% of women report never going to bars, compared to {never_male:.1f}% of men." \
+    if gss.respondents(CROSSTABS, "bar") else ""
+st.write(f"""Men are significantly more likely to visit bars frequently (daily, weekly, or monthly). {never}
+
+Results show that men and women have similar overall socialization patterns. The data suggests that men are more likely to visit bars more than women, although this may be due to cultural or societal factors. Women and men may like going to different social settings. For the issue of the Male Loneliness Epidemic, further analysis is needed to determine if there is a gendered difference in the number of close friends people have. I also want to look at the frequency of calling and visiting friends, because I think that is an important factor in the qualities of social connections.""")
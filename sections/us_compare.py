@@ -0,0 +1,66 @@
+import streamlit as st
+
+from datastory import perf, trends
+
+## HOW THE U.S. COMPARES
+
+st.title("How Does the U.S. Compare?")
+perf.first_content()
+
+# every country and metric fitted in one pass and cached per process, see datastory/trends.py
+analysis = trends.analyze()
+comparison = analysis.compare("United States")
+
+# the findings are read off the comparison, so they follow the data when a release is added
+ladder = comparison.loc["Ladder score"]
+happier = ladder["Rank"] <= ladder["Countries ranked"] / 2
+slipping = ladder["Slope per year"] < 0
+st.subheader(
+    f"The U.S. is {'happier' if happier else 'less happy'} than most countries, "
+    f"{'but' if happier == slipping else 'and'} it is {'slipping' if slipping else 'improving'}."
+)
+
+st.write(f"""
+The trend lines so far only follow the United States. To see whether its trend is unusual, I fit the same kind of trend line to every country in the World Happiness data, for every measure in it, and compared where each country stood in {analysis.base_year} with where it stands now.
+
+_The slope is the average change per year over every year a country was surveyed. Volatility is how far the yearly values stray from that line. Rank 1 is the best, which for perceptions of corruption and negative affect means the lowest, and "trend better than" compares the slopes the same way, so for those two a falling slope is the better one._
+""")
+
+st.subheader("The U.S. next to the median country")
+st.dataframe(comparison.round(3))
+
+# measures where the U.S. went the wrong way since the base year while the median country improved;
+# trends.analyze() only fits values on the survey's own scale, so a new report cannot fake a change here
+lower = comparison.index.isin(trends.LOWER_IS_BETTER)
+change = comparison[f"Change since {analysis.base_year}"]
+median_change = comparison[f"Median change since {analysis.base_year}"]
+went_worse = change.where(~lower, -change) < 0
+median_improved = median_change.where(~lower, -median_change) > 0
+lost = [m.lower() for m in comparison.index[went_worse & median_improved] if m != "Ladder score"]
+if lost:
+    measures = ", ".join(lost[:-1]) + " and " + lost[-1] if len(lost) > 1 else lost[0]
+    lost_ground = f"Since {analysis.base_year} it has lost ground on {measures} while the median country gained."
+else:
+    lost_ground = f"Since {analysis.base_year} it has not lost ground on any measure where the median country gained."
+
+st.write(f"""
+The U.S. ranks {ladder['Rank']:.0f} of {ladder['Countries ranked']:.0f} countries on the ladder score, which has {'fallen' if slipping else 'risen'} by {abs(ladder['Slope per year']):.3f} points a year. That trend is better than in {ladder['Trend better than % of countries']:.0f}% of countries. {lost_ground}
+""")
+
+st.subheader("Leaderboard")
+st.write("Pick a measure to rank every country by it. Click a column header to sort by it instead.")
+
+
+# only this part reruns when the measure changes
+@perf.fragment
+def leaderboard():
+    metric = st.selectbox("Measure", analysis.metrics)
+    st.dataframe(analysis.frame(metric).round(3))
+
+
+leaderboard()
+
+st.caption(
+    "Only the ladder score from the single-year reports, like the 2024 one, is on the survey's own scale (their other "
+    "columns are each factor's contribution to the score), so the other measures end with the yearly data."
+)
@@ -0,0 +1,19 @@
+import numpy as np
+
+from datastory.binning import WeightedSample
+
+
+def test_group_without_weight_has_no_percentiles():
+    sample = WeightedSample([0, 1, 2, 3], [[1, 2, 3, 4], [0, 0, 0, 0]], ["MALE", "FEMALE"])
+    assert sample.median().tolist()[0] == 2
+    assert np.isnan(sample.median()[1])
+    assert np.isnan(sample.percentile((25, 75))[1]).all()
+
+    summary = sample.summary()
+    assert summary.loc["MALE"].tolist() == [2.0, 1.0, 2.0, 3.0]
+    assert summary.loc["FEMALE"].isna().all()
+
+
+def test_quantile_edges_of_an_empty_sample():
+    sample = WeightedSample([0, 1, 2, 3], [[0, 0, 0, 0]], ["MALE"])
+    assert sample.quantile_edges(4).tolist() == [0, 4]
@@ -0,0 +1,28 @@
+import io
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+from datastory import charts
+
+FRAME = pd.DataFrame({"MALE": [3, 5], "FEMALE": [4, 2]}, index=["YES", "NO"])
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    # nothing written to .cache, nothing read from an earlier run
+    monkeypatch.setattr(charts, "cache", charts.RenderCache())
+
+
+def test_svg_render_is_left_as_vector():
+    payload = charts.render("bar", FRAME, charts._draw_bars, fmt="svg", title="t", xlabel="x", ylabel="y")
+    assert payload.lstrip().startswith(b"<?xml")
+    assert b"<svg" in payload
+
+
+def test_png_render_fits_the_column():
+    payload = charts.render("bar", FRAME, charts._draw_bars, figsize=(20, 6), title="t", xlabel="x", ylabel="y")
+    with Image.open(io.BytesIO(payload)) as image:
+        assert image.format == "PNG"
+        assert image.width == charts.MAX_WIDTH
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from datastory import cube, gss, microdata
+from datastory.crosstab import CrosstabEngine
+
+
+def _cube(tmp_path, **columns):
+    source = tmp_path / "gss.csv"
+    pd.DataFrame(columns).to_csv(source, index=False)
+    microdata.ingest(source, tmp_path / "store")
+    return cube.CountCube(cube.build(microdata.Store(tmp_path / "store"), tmp_path / "cube.npy"))
+
+
+def test_slice_of_a_store_without_an_item(tmp_path):
+    # no bfcall column, so the best-friend calling crosstab has nobody in it
+    counts = _cube(
+        tmp_path,
+        year=[2016, 2016, 2018, 2020],
+        sex=["MALE", "FEMALE", "FEMALE", "MALE"],
+        age=["25", "40", "89 OR OLDER", "DK"],
+        socbar=["NEVER", "ONCE A YEAR", "NEVER", "ALMOST DAILY"],
+    )
+    assert "bf_call" not in counts.names
+
+    engine = CrosstabEngine(counts.tables((2016, 2018), (), gss.CATEGORIES))
+    assert engine.categories["bf_call"] == gss.CATEGORIES["bf_call"]
+    assert engine.frame("bf_call").to_numpy().sum() == 0
+    assert engine.frame("bar").loc["NEVER"].tolist() == [1, 1]
+    assert engine.frame("bar").loc["ALMOST DAILY"].tolist() == [0, 0]
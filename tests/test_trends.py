@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from datastory import countries, trends
+
+
+def _releases():
+    rows = []
+    for country, ladder, support in [("A", 6.0, 0.90), ("B", 5.0, 0.80)]:
+        for i, year in enumerate(range(2012, 2016)):
+            rows.append({"Country name": country, "year": year, "Ladder score": ladder - 0.1 * i,
+                         "Social support": support - 0.01 * i, "schema": "world_happiness_panel"})
+        # a single-year report: the ladder score is on the survey's scale, social support is a contribution to it
+        rows.append({"Country name": country, "year": 2016, "Ladder score": ladder - 0.4,
+                     "Social support": 1.4, "schema": "world_happiness_report"})
+    df = pd.DataFrame(rows)
+    for metric in countries.ALL_METRICS:
+        if metric not in df:
+            df[metric] = np.nan
+    return df
+
+
+def test_contribution_scale_values_are_not_fitted(monkeypatch):
+    monkeypatch.setattr(countries.loading, "load", lambda name: _releases())
+    comparison = trends._build().compare("A")
+
+    support = comparison.loc["Social support"]
+    assert support["Latest year"] == 2015
+    assert support["A"] == np.float32(0.87)
+    assert np.isclose(support["Change since 2012"], -0.03)
+    assert support["Slope per year"] < 0
+
+    ladder = comparison.loc["Ladder score"]
+    assert ladder["Latest year"] == 2016
+    assert np.isclose(ladder["Change since 2012"], -0.4)